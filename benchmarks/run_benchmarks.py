@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark parsing and conversion of PC-CORA files, on synthetic files of several sizes (see ``pccora.synthetic``).
+
+For each case and size, the best time of ``--repeat`` runs is reported as records per second and MB per second,
+with the peak memory allocated during one more run (measured with ``tracemalloc``, which NumPy reports to). The
+results can be saved as JSON, and compared with a previous JSON file, failing when the throughput of a case
+dropped by more than the tolerance.
+
+python run_benchmarks.py --output results.json
+python run_benchmarks.py --compare results.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+
+from pccora import PCCORAParser, read_metadata
+from pccora.pccora import ENGINES, SYSPAR_OFFSET
+from pccora.synthetic import generate_file
+
+# the conversion scripts are not part of the package
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'scripts')
+sys.path.insert(0, SCRIPTS_DIRECTORY)
+
+# Number of high resolution records of the synthetic files of each kind, for each size. S files have one record
+# per second, so the large S file is a sounding of about eight hours.
+SIZES = OrderedDict([
+    ('small', {'edt': 500, 's': 1000, 'z': 500}),
+    ('medium', {'edt': 3000, 's': 6000, 'z': 3000}),
+    ('large', {'edt': 15000, 's': 30000, 'z': 15000})
+])
+
+parser = argparse.ArgumentParser(description='Benchmark parsing and converting PC-CORA files.')
+parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES), help='File sizes to benchmark')
+parser.add_argument('--cases', nargs='+', default=None,
+                    help='Only run the cases which name starts with one of these values, e.g. parse_file')
+parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each case, the best one is kept')
+parser.add_argument('--output', help='Write the results to this JSON file')
+parser.add_argument('--compare', help='Compare the results with this JSON file, written by --output')
+parser.add_argument('--tolerance', type=float, default=0.2,
+                    help='Fail when the records per second of a case are lower than in the --compare results by more '
+                         'than this fraction (default: %(default)s)')
+
+
+def _parse(method, engine):
+    def run(file_arg, output):
+        pccora_parser = PCCORAParser(engine=engine)
+        getattr(pccora_parser, method)(file_arg)
+        return pccora_parser
+
+    return run
+
+
+def _read_metadata(file_arg, output):
+    return read_metadata(file_arg)
+
+
+def _sounding(file_arg):
+    pccora_parser = PCCORAParser(engine='numpy')
+    pccora_parser.parse_file(file_arg)
+    return pccora_parser.get_sounding()
+
+
+def _convert2csv(file_arg, output):
+    from convert2csv import convert2csv
+    sounding = _sounding(file_arg)
+    convert2csv(data=dict(head=sounding.header, ident=sounding.identification, data=sounding.data,
+                          hires_data=sounding.hires),
+                options=dict(include_header=True, include_ident=True, include_data=True, include_hires=True),
+                file=output + '.csv')
+
+
+def _convert2netcdf4(file_arg, output):
+    from convert2netcdf4 import convert_add_day
+    convert_add_day(_sounding(file_arg), output + '.nc')
+
+
+def cases():
+    """The benchmark cases: name, kind of file, and function called with the file and an output path prefix"""
+    result = []
+    for engine in ENGINES:
+        result.append(('parse_file[%s]' % engine, 'edt', _parse('parse_file', engine)))
+        result.append(('parse_s_file[%s]' % engine, 's', _parse('parse_s_file', engine)))
+        result.append(('parse_z_file[%s]' % engine, 'z', _parse('parse_z_file', engine)))
+    result.append(('read_metadata', 'edt', _read_metadata))
+    result.append(('convert2csv', 'edt', _convert2csv))
+    result.append(('convert2netcdf4', 'edt', _convert2netcdf4))
+    return result
+
+
+def measure(function, file_arg, output, repeat):
+    """Return the best time of ``repeat`` runs, and the peak memory allocated by one more run"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(file_arg, output)
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function(file_arg, output)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(seconds), peak_memory
+
+
+def run(sizes, names, repeat, directory):
+    results = []
+    selected = [case for case in cases() if names is None or any(case[0].startswith(name) for name in names)]
+    for size in sizes:
+        files = {}
+        for kind, records in SIZES[size].items():
+            files[kind] = os.path.join(directory, '%s.%s' % (size, kind))
+            generate_file(files[kind], kind, records=records)
+        for name, kind, function in selected:
+            try:
+                seconds, peak_memory = measure(function, files[kind], os.path.join(directory, 'output'), repeat)
+            except ImportError as e:
+                print("%-28s %-6s skipped (%s)" % (name, size, e))
+                continue
+            # only the header and identification are read by read_metadata, counted as one record
+            if name == 'read_metadata':
+                file_size, records = SYSPAR_OFFSET, 1
+            else:
+                file_size, records = os.path.getsize(files[kind]), SIZES[size][kind]
+            result = OrderedDict([
+                ('name', name),
+                ('size', size),
+                ('records', records),
+                ('bytes', file_size),
+                ('seconds', seconds),
+                ('records_per_second', records / seconds),
+                ('mb_per_second', file_size / seconds / 1e6),
+                ('peak_memory', peak_memory)
+            ])
+            results.append(result)
+            print("%-28s %-6s %10.2f ms %12.0f records/s %8.1f MB/s %8.1f MB peak" %
+                  (name, size, seconds * 1000, result['records_per_second'], result['mb_per_second'],
+                   peak_memory / 1e6))
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the regressions of ``results`` compared with the ``baseline`` results: the cases which records per
+    second are lower than in the baseline by more than ``tolerance`` (a fraction), as (name, size, ratio) tuples.
+    """
+    baseline = dict(((result['name'], result['size']), result) for result in baseline)
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['name'], result['size']))
+        if previous is None:
+            continue
+        ratio = result['records_per_second'] / previous['records_per_second']
+        if ratio < 1 - tolerance:
+            regressions.append((result['name'], result['size'], ratio))
+    return regressions
+
+
+def main():
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    try:
+        results = run(args.sizes, args.cases, args.repeat, directory)
+    finally:
+        shutil.rmtree(directory)
+
+    if args.output:
+        with open(args.output, 'w') as fid:
+            json.dump(OrderedDict([
+                ('date', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+                ('commit', _commit()),
+                ('python', platform.python_version()),
+                ('numpy', np.__version__),
+                ('platform', platform.platform()),
+                ('results', results)
+            ]), fid, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fid:
+            baseline = json.load(fid)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for name, size, ratio in regressions:
+            print("Regression: %s %s at %.0f%% of the throughput of %s" %
+                  (name, size, ratio * 100, baseline.get('commit') or args.compare))
+        if regressions:
+            sys.exit(1)
+        print("No regression beyond %.0f%% compared with %s" % (args.tolerance * 100, args.compare))
+
+
+if __name__ == '__main__':
+    main()
@@ -16,7 +16,15 @@ Hands-on example:
     >>> assert pccora_parser.get_data() is not None
 """
 
-from .pccora import PCCORAParser
+from .batch import parse_many, iter_parse_many
+from .cache import ParseCache
+from .catalog import Catalog
+from .follower import HiresFollower
+from .pccora import PCCORAParser, PCCORAResult, HeaderMismatchWarning, read_metadata, parse_bytes, parse_edt, \
+    parse_s, parse_z
+from .reader import PCCORAReader
+from .recovery import Problem, recover_bytes, recover_file
+from .scanner import MetadataTable, scan_files, scan_directory
 
 # ===============================================================================
 # Metadata
@@ -27,5 +35,40 @@ __author__ = "Bruno P. Kinoshita <brunodepaulak@yahoo.com.br>"
 # exposed names
 # ===============================================================================
 __all__ = [
-    'PCCORAParser'
+    'PCCORAParser',
+    'PCCORAReader',
+    'PCCORAResult',
+    'HiresFollower',
+    'HeaderMismatchWarning',
+    'read_metadata',
+    'parse_bytes',
+    'parse_edt',
+    'parse_s',
+    'parse_z',
+    'recover_bytes',
+    'recover_file',
+    'Problem',
+    'parse_many',
+    'iter_parse_many',
+    'ParseCache',
+    'MetadataTable',
+    'scan_files',
+    'scan_directory',
+    'Catalog'
 ]
+
+# NumPy is an optional dependency
+try:
+    from .sounding import Columns, Sounding
+    from .writer import write_bytes, write_edt, write_s, write_z
+
+    __all__ += [
+        'Columns',
+        'Sounding',
+        'write_bytes',
+        'write_edt',
+        'write_s',
+        'write_z'
+    ]
+except ImportError:
+    pass
@@ -0,0 +1,215 @@
+"""
+Parse many PC-CORA files in parallel, with a pool of worker processes.
+
+Each worker parses one file, and sends back the ``Sounding`` in its compact form (see ``Sounding.to_compact()``),
+either pickled through the pool pipe, or written into a ``multiprocessing.shared_memory`` block, which the parent
+maps without copying the arrays again.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from .pccora import PCCORAParser, _check_kind, _check_options
+from .recovery import recover_file
+
+# Parser method for each kind of file
+METHODS = {
+    'edt': 'parse_file',
+    's': 'parse_s_file',
+    'z': 'parse_z_file'
+}
+
+# How the workers send the soundings back to the parent process
+TRANSPORTS = ('pickle', 'shared_memory')
+
+# Files submitted to the pool and not yielded yet, per worker, so that the parsed soundings (and their shared
+# memory blocks) do not pile up when the caller is slower than the workers
+_IN_FLIGHT_PER_WORKER = 2
+
+
+class ParseResult(object):
+    """
+    The outcome of parsing one file with ``parse_many()``.
+
+    * ``path``, the parsed file
+    * ``sounding``, the parsed ``Sounding``, or ``None`` if the file could not be parsed
+    * ``error``, the exception raised while parsing the file, or ``None``
+    * ``problems``, the ``Problem`` found in the file with ``recover=True``, see ``recover_bytes()``
+    """
+
+    def __init__(self, path, sounding=None, error=None, problems=()):
+        self.path = path
+        self.sounding = sounding
+        self.error = error
+        self.problems = list(problems)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "ParseResult(path=%r, %s)" % (self.path, self.sounding if self.ok else "error=%r" % self.error)
+
+
+def _parse(path, kind, engine, missing, recover):
+    """Parse a file, returning its sounding, and the problems found when recovering"""
+    if recover:
+        from .sounding import Sounding
+        result, problems = recover_file(path, kind, engine, missing)
+        return Sounding.from_result(result), problems
+    parser = PCCORAParser(engine=engine, missing=missing)
+    getattr(parser, METHODS[kind])(path)
+    return parser.get_sounding(), []
+
+
+def _parse_to_shared_memory(path, kind, engine, missing, recover):
+    """
+    Parse a file, writing the arrays of the sounding into a new shared memory block. Returns the name of the
+    block, the sounding compact metadata, and the problems found when recovering.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+    sounding, problems = _parse(path, kind, engine, missing, recover)
+    blocks = []
+
+    def allocate(size):
+        # empty blocks are not allowed
+        blocks.append(SharedMemory(create=True, size=max(1, size)))
+        return blocks[0].buf
+
+    try:
+        metadata, _ = sounding.to_compact(allocate=allocate)
+    except BaseException:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+    blocks[0].close()
+    return blocks[0].name, metadata, problems
+
+
+class _SharedBuffer(object):
+    """
+    Exposes a shared memory block to NumPy. Every array created over it references this object, so the block is
+    only closed once the last array using it is deleted.
+    """
+
+    def __init__(self, block):
+        import numpy as np
+        self.block = block
+        self.__array_interface__ = {
+            'shape': (block.size,),
+            'typestr': '|u1',
+            'data': (np.frombuffer(block.buf, dtype=np.uint8).ctypes.data, False),
+            'version': 3
+        }
+
+
+def _attach_shared_memory(name, metadata):
+    import numpy as np
+    from multiprocessing.shared_memory import SharedMemory
+    from .sounding import Sounding
+    block = SharedMemory(name=name)
+    # the parent keeps the mapping, so the name can be removed straight away
+    block.unlink()
+    return Sounding.from_compact(metadata, np.asarray(_SharedBuffer(block)))
+
+
+def _discard_shared_memory(name):
+    from multiprocessing.shared_memory import SharedMemory
+    try:
+        block = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def _check_arguments(kind, engine, missing, transport):
+    _check_kind(kind)
+    _check_options(engine, missing)
+    if transport not in TRANSPORTS:
+        raise ValueError("Invalid transport '%s', must be one of %s" % (transport, ', '.join(TRANSPORTS)))
+
+
+def iter_parse_many(paths, workers=None, kind='edt', engine='numpy', missing='sentinel', transport='pickle',
+                    recover=False):
+    """
+    Parse ``paths`` with ``workers`` processes (the number of CPUs by default), yielding a ``ParseResult`` for
+    each file as soon as it is parsed, in completion order. Errors parsing a file are returned in its
+    ``ParseResult``, not raised. ``paths`` is consumed lazily, only a few files per worker being parsed ahead of
+    the caller.
+
+    ``kind`` is the kind of every file (``edt``, ``s`` or ``z``), and ``engine`` and ``missing`` are passed to
+    ``PCCORAParser``. Requires NumPy, for the ``Sounding`` results.
+
+    With ``transport='shared_memory'`` (Python 3.8+), the arrays of each sounding are views over a shared memory
+    block written by the worker, which is closed when its last array is deleted.
+
+    With ``recover=True``, truncated and corrupt files are parsed with ``recover_bytes()``, and the problems found
+    returned in each ``ParseResult``. Blocks not handed to the caller yet, on
+    errors, Ctrl-C, or when the caller stops iterating, are removed.
+    """
+    results = _iter_indexed(paths, workers, kind, engine, missing, transport, recover)
+    try:
+        for _, result in results:
+            yield result
+    finally:
+        results.close()
+
+
+def _iter_indexed(paths, workers, kind, engine, missing, transport, recover):
+    """Parse ``paths`` like ``iter_parse_many()``, yielding the index of each file in ``paths`` with its result"""
+    _check_arguments(kind, engine, missing, transport)
+    shared_memory = transport == 'shared_memory'
+    if shared_memory:
+        # started before the workers, so that they share it, and the blocks of a killed worker or parent are
+        # still removed when the parent exits
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+    parse = _parse_to_shared_memory if shared_memory else _parse
+    workers = workers or os.cpu_count()
+    paths = enumerate(paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit():
+            for index, path in islice(paths, workers * _IN_FLIGHT_PER_WORKER - len(pending)):
+                pending[executor.submit(parse, path, kind, engine, missing, recover)] = index, path
+
+        try:
+            submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, path = pending.pop(future)
+                    try:
+                        if shared_memory:
+                            name, metadata, problems = future.result()
+                            sounding = _attach_shared_memory(name, metadata)
+                        else:
+                            sounding, problems = future.result()
+                        result = ParseResult(path, sounding=sounding, problems=problems)
+                    except Exception as e:
+                        result = ParseResult(path, error=e)
+                    # keep the workers busy while the caller handles the result
+                    submit()
+                    yield index, result
+        finally:
+            # on errors, Ctrl-C, or when the caller stops iterating, do not parse the remaining files
+            for future in pending:
+                future.cancel()
+            if shared_memory:
+                for future in pending:
+                    if not future.cancelled() and future.exception() is None:
+                        _discard_shared_memory(future.result()[0])
+
+
+def parse_many(paths, workers=None, kind='edt', engine='numpy', missing='sentinel', transport='pickle',
+               recover=False):
+    """
+    Parse ``paths`` in parallel like ``iter_parse_many()``, returning the list of ``ParseResult`` in the same order
+    as ``paths``, one per path, even when a path is repeated.
+    """
+    results = sorted(_iter_indexed(paths, workers, kind, engine, missing, transport, recover), key=lambda item: item[0])
+    return [result for _, result in results]
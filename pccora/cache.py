@@ -0,0 +1,216 @@
+"""
+Persistent cache of parsed PC-CORA files.
+
+``ParseCache`` stores each parsed ``Sounding`` on disk in its compact form (see ``Sounding.to_compact()``): a small
+pickled metadata dictionary, followed by all the arrays in a single buffer, so a cache hit is a single read into
+memory, without decoding anything. Entries are keyed by the file path, kind and missing values policy, and are
+only used while the file size and modification time (and optionally its content hash) are unchanged. The most
+recently used soundings are also kept in memory.
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .pccora import _check_kind, _check_missing, parse_bytes
+
+# Cache entry prefix: magic, format version, and length of the pickled metadata
+_PREFIX = struct.Struct('<6sHQ')
+_MAGIC = b'PCCORA'
+_VERSION = 1
+_ALIGNMENT = 8
+_EXTENSION = '.pccora-cache'
+
+VERIFY = ('stat', 'hash')
+
+
+def default_directory():
+    """Return the default cache directory, ``$XDG_CACHE_HOME/pccora`` or ``~/.cache/pccora``"""
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                        'pccora')
+
+
+def _content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class ParseCache(object):
+    """
+    A size-bounded cache of parsed files, on disk and in memory. Requires NumPy.
+
+    * ``directory``, where the entries are stored (see ``default_directory()``), created if needed
+    * ``max_size``, the total size in bytes of the entries on disk, the least recently used being removed first
+    * ``memory_items``, how many soundings are also kept in memory (0 to disable)
+    * ``verify``, ``stat`` to detect changed files by their size and modification time, or ``hash`` to also
+      compare the hash of their content, which requires reading the file on every access
+
+    ``parse_file()`` returns the cached ``Sounding`` of a file, parsing it with the numpy engine on a miss. The
+    cache may be shared between threads, and between processes using the same directory.
+    """
+
+    def __init__(self, directory=None, max_size=1024 ** 3, memory_items=16, verify='stat'):
+        if verify not in VERIFY:
+            raise ValueError("Invalid verify '%s', must be one of %s" % (verify, ', '.join(VERIFY)))
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+        self.memory_items = memory_items
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def _entry_path(self, file_arg, kind, missing):
+        key = '\0'.join([os.path.abspath(file_arg), kind, missing])
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + _EXTENSION)
+
+    def _signature(self, file_arg, data=None):
+        stat = os.stat(file_arg)
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if self.verify == 'hash':
+            if data is None:
+                with open(file_arg, 'rb') as fid:
+                    data = fid.read()
+            signature['hash'] = _content_hash(data)
+        return signature
+
+    def parse_file(self, file_arg, kind='edt', missing='sentinel'):
+        """
+        Return the ``Sounding`` of a PC-CORA (EDT), S or Z (``kind``) file, from the cache when the file did not
+        change, otherwise parsing it, and storing it in the cache.
+        """
+        _check_kind(kind)
+        _check_missing(missing)
+        entry_path = self._entry_path(file_arg, kind, missing)
+        signature = self._signature(file_arg)
+
+        with self._lock:
+            cached = self._memory.get(entry_path)
+            if cached is not None and cached[0] == signature:
+                self._memory.move_to_end(entry_path)
+                self.hits += 1
+                return cached[1]
+
+        sounding = self._load(entry_path, signature)
+        if sounding is None:
+            with open(file_arg, 'rb') as fid:
+                data = fid.read()
+            if self.verify == 'hash':
+                signature = self._signature(file_arg, data)
+            from .sounding import Sounding
+            sounding = Sounding.from_result(parse_bytes(data, kind, engine='numpy', missing=missing))
+            self._store(entry_path, signature, sounding)
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._remember(entry_path, signature, sounding)
+        return sounding
+
+    def _remember(self, entry_path, signature, sounding):
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[entry_path] = (signature, sounding)
+            self._memory.move_to_end(entry_path)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _load(self, entry_path, signature):
+        """Return the cached sounding, or ``None`` if missing or stale, in which case the entry is removed"""
+        from .sounding import Sounding
+        try:
+            with open(entry_path, 'rb') as fid:
+                magic, version, metadata_length = _PREFIX.unpack(fid.read(_PREFIX.size))
+                if magic != _MAGIC or version != _VERSION:
+                    raise ValueError("Not a cache entry")
+                metadata = pickle.loads(fid.read(metadata_length))
+                if metadata['signature'] != signature:
+                    raise ValueError("Stale cache entry")
+                fid.seek(_aligned(_PREFIX.size + metadata_length))
+                buffer = bytearray(metadata['buffer_size'])
+                if fid.readinto(buffer) != len(buffer):
+                    raise ValueError("Truncated cache entry")
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove(entry_path)
+            return None
+        # the modification time of the entries is used as their last access time, for the LRU eviction
+        os.utime(entry_path)
+        return Sounding.from_compact(metadata['sounding'], buffer)
+
+    def _store(self, entry_path, signature, sounding):
+        compact, buffer = sounding.to_compact()
+        metadata = pickle.dumps({
+            'signature': signature,
+            'buffer_size': len(buffer),
+            'sounding': compact
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_size is not None and _aligned(_PREFIX.size + len(metadata)) + len(buffer) > self.max_size:
+            return
+        # written to a temporary file first, so that other processes never read an incomplete entry
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fid:
+                fid.write(_PREFIX.pack(_MAGIC, _VERSION, len(metadata)))
+                fid.write(metadata)
+                fid.write(b'\0' * (_aligned(_PREFIX.size + len(metadata)) - _PREFIX.size - len(metadata)))
+                fid.write(buffer)
+            os.replace(temporary_path, entry_path)
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_EXTENSION):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Remove the least recently used entries, until the entries fit in ``max_size``"""
+        if self.max_size is None:
+            return
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def size(self):
+        """Total size in bytes of the entries on disk"""
+        return sum(entry_size for _, entry_size, _ in self._entries())
+
+    def clear(self):
+        """Remove every entry, on disk and in memory"""
+        with self._lock:
+            self._memory.clear()
+        for _, _, path in self._entries():
+            self._remove(path)
+
+
+def _aligned(size):
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
@@ -0,0 +1,265 @@
+"""
+SQLite catalog of PC-CORA soundings.
+
+``Catalog`` indexes the identification section of each file (station, position and launch time, see
+``pccora.scanner``), and a few summary statistics of its high resolution records (duration, lowest pressure and
+highest altitude), in a SQLite database. Queries by station, time range, bounding box and altitude use the
+database indexes, without reading the files again. Updates only read the files which size or modification time
+changed since they were indexed.
+"""
+
+import math
+import os
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .pccora import pccora_data, RECORDS_OFFSET, MISSING_VALUE, _check_kind
+from .scanner import FILE_NAME_REGEX, find_files, scan_file
+
+# Outcome of ``Catalog.update()``: how many files were (re)indexed, were already up to date, and were removed.
+UpdateSummary = namedtuple('UpdateSummary', ['indexed', 'unchanged', 'removed'])
+
+# Columns of the ``soundings`` table, and their SQLite types
+COLUMNS = [
+    ('path', 'TEXT PRIMARY KEY'),
+    ('kind', 'TEXT'),
+    ('size', 'INTEGER'),
+    ('mtime_ns', 'INTEGER'),
+    ('station_type', 'INTEGER'),
+    ('wmo_block_number', 'INTEGER'),
+    ('wmo_station_number', 'INTEGER'),
+    ('station_latitude', 'REAL'),
+    ('station_longitude', 'REAL'),
+    ('station_altitude', 'INTEGER'),
+    ('datetime', 'TEXT'),
+    ('launch_time', 'TEXT'),
+    ('radiosonde_number', 'TEXT'),
+    ('sounding_number', 'TEXT'),
+    ('reason_termination', 'INTEGER'),
+    ('data_count', 'INTEGER'),
+    ('hires_count', 'INTEGER'),
+    ('header_matches', 'INTEGER'),
+    ('duration', 'REAL'),
+    ('min_pressure', 'REAL'),
+    ('max_altitude', 'REAL'),
+    ('error', 'TEXT')
+]
+
+_COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+_STATION_COLUMNS = ('wmo_block_number', 'wmo_station_number', 'station_latitude', 'station_longitude',
+                    'station_altitude')
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS soundings (%s)" % ', '.join('%s %s' % column for column in COLUMNS),
+    "CREATE INDEX IF NOT EXISTS soundings_station ON soundings (wmo_block_number, wmo_station_number, launch_time)",
+    "CREATE INDEX IF NOT EXISTS soundings_launch_time ON soundings (launch_time)",
+    "CREATE INDEX IF NOT EXISTS soundings_position ON soundings (station_latitude, station_longitude)"
+]
+
+# Dates are stored as ISO 8601 text, which sorts like the dates
+_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Altitudes are stored in the records with this offset, see ``pccora_data``
+_ALTITUDE_OFFSET = 30000
+
+
+def _pressure(logarithmic_pressure):
+    """Pressure in hPa of a logarithmic pressure, 4096 * ln(pressure)"""
+    return math.exp(logarithmic_pressure / 4096.0)
+
+
+def summarize(file_arg, kind, data_count, hires_count):
+    """
+    Return the duration in seconds, lowest pressure in hPa, and highest altitude in metres (only for PC-CORA (EDT)
+    files) of the ``hires_count`` high resolution records of a file, ignoring missing values. Values which cannot
+    be computed are ``None``. Requires NumPy.
+    """
+    import numpy as np
+    from .numpy_engine import HIRES_LAYOUTS
+    dtype = HIRES_LAYOUTS[kind][0]
+    with open(file_arg, 'rb') as fid:
+        fid.seek(RECORDS_OFFSET + data_count * pccora_data.sizeof())
+        buf = fid.read(hires_count * dtype.itemsize)
+    records = np.frombuffer(buf, dtype=dtype, count=len(buf) // dtype.itemsize)
+
+    def valid(name):
+        column = records[name]
+        return column[column != MISSING_VALUE]
+
+    time = valid('time')
+    logarithmic_pressure = valid('logarithmic_pressure')
+    duration = float(time.max()) if len(time) else None
+    min_pressure = _pressure(float(logarithmic_pressure.min())) if len(logarithmic_pressure) else None
+    max_altitude = None
+    if kind == 'edt':
+        altitude = valid('altitude')
+        max_altitude = float(altitude.max()) + _ALTITUDE_OFFSET if len(altitude) else None
+    return duration, min_pressure, max_altitude
+
+
+def _index_file(path, kind):
+    """Return the catalog row of a file, as a dictionary"""
+    row = scan_file(path, kind)
+    row['mtime_ns'] = None
+    row['duration'] = row['min_pressure'] = row['max_altitude'] = None
+    try:
+        row['mtime_ns'] = os.stat(path).st_mtime_ns
+        if row['error'] is None:
+            row['duration'], row['min_pressure'], row['max_altitude'] = summarize(
+                path, row['kind'], row['data_count'], row['hires_count'])
+    except ImportError:
+        # without NumPy, the summary statistics are left NULL
+        pass
+    except (OSError, ValueError) as e:
+        row['error'] = str(e)
+    return row
+
+
+def _to_database(row):
+    values = []
+    for name in _COLUMN_NAMES:
+        value = row[name]
+        # the station values are stored as NULL when missing, so that they never match a query
+        if name in _STATION_COLUMNS and value == MISSING_VALUE:
+            value = None
+        elif isinstance(value, datetime):
+            value = value.strftime(_DATETIME_FORMAT)
+        values.append(value)
+    return values
+
+
+def _from_database(cursor, values):
+    row = dict(zip([column[0] for column in cursor.description], values))
+    for name in ('datetime', 'launch_time'):
+        if row.get(name) is not None:
+            row[name] = datetime.strptime(row[name], _DATETIME_FORMAT)
+    if row.get('header_matches') is not None:
+        row['header_matches'] = bool(row['header_matches'])
+    return row
+
+
+class Catalog(object):
+    """
+    A catalog of PC-CORA files in the SQLite ``database`` (a file name, or ``:memory:``), created if needed.
+
+    * ``update()`` and ``update_directory()`` index new and changed files
+    * ``query()`` returns the indexed soundings matching a station, time range, bounding box or altitude
+
+    Computing the summary statistics requires NumPy, they are ``None`` without it. The catalog must be used from the
+    thread that created it.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._connection = sqlite3.connect(database)
+        self._connection.row_factory = _from_database
+        with self._connection:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) AS count FROM soundings").fetchone()['count']
+
+    def update(self, paths, workers=None, kind=None):
+        """
+        Index the files in ``paths`` which are new, or which size or modification time changed, with ``workers``
+        threads. ``kind`` is the kind of every file, guessed from each file name when ``None``. Files which
+        cannot be read are indexed with their ``error``. Returns an ``UpdateSummary``.
+        """
+        if kind is not None:
+            _check_kind(kind)
+        indexed = dict((row['path'], (row['size'], row['mtime_ns'])) for row in
+                       self._connection.execute("SELECT path, size, mtime_ns FROM soundings"))
+        changed = []
+        unchanged = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                signature = None
+            if signature is not None and indexed.get(path) == signature:
+                unchanged += 1
+            else:
+                changed.append(path)
+
+        with ThreadPoolExecutor(max_workers=workers or min(32, 4 * (os.cpu_count() or 1))) as executor:
+            rows = executor.map(_index_file, changed, [kind] * len(changed))
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO soundings (%s) VALUES (%s)" %
+                    (', '.join(_COLUMN_NAMES), ', '.join('?' * len(_COLUMN_NAMES))),
+                    (_to_database(row) for row in rows))
+        return UpdateSummary(len(changed), unchanged, 0)
+
+    def update_directory(self, directory, workers=None, kind=None, pattern=FILE_NAME_REGEX):
+        """
+        Index the files under ``directory`` matching ``pattern`` (see ``find_files()``) with ``update()``, and
+        remove the indexed files under ``directory`` which no longer exist.
+        """
+        directory = os.path.abspath(directory)
+        paths = [os.path.abspath(path) for path in find_files(directory, pattern)]
+        summary = self.update(paths, workers, kind)
+        found = set(paths)
+        removed = [row['path'] for row in self._connection.execute("SELECT path FROM soundings")
+                   if row['path'].startswith(directory + os.sep) and row['path'] not in found]
+        with self._connection:
+            self._connection.executemany("DELETE FROM soundings WHERE path = ?", [(path,) for path in removed])
+        return summary._replace(removed=len(removed))
+
+    def query(self, wmo_block_number=None, wmo_station_number=None, start=None, end=None, bbox=None,
+              min_altitude=None, max_pressure=None, kind=None):
+        """
+        Return the indexed soundings matching every given criteria, as dictionaries with the ``COLUMNS`` keys,
+        ordered by launch time.
+
+        * ``wmo_block_number`` and ``wmo_station_number``, the WMO station
+        * ``start`` and ``end``, datetimes, the launch time being ``start <= launch_time < end``
+        * ``bbox``, the station (min latitude, min longitude, max latitude, max longitude), in degrees
+        * ``min_altitude``, the lowest highest altitude, in metres (PC-CORA (EDT) files only)
+        * ``max_pressure``, the highest lowest pressure, in hPa
+        * ``kind``, the kind of file
+        """
+        conditions = []
+        parameters = []
+
+        def where(condition, *values):
+            conditions.append(condition)
+            parameters.extend(values)
+
+        if wmo_block_number is not None:
+            where("wmo_block_number = ?", wmo_block_number)
+        if wmo_station_number is not None:
+            where("wmo_station_number = ?", wmo_station_number)
+        if start is not None:
+            where("launch_time >= ?", start.strftime(_DATETIME_FORMAT))
+        if end is not None:
+            where("launch_time < ?", end.strftime(_DATETIME_FORMAT))
+        if bbox is not None:
+            min_latitude, min_longitude, max_latitude, max_longitude = bbox
+            where("station_latitude BETWEEN ? AND ? AND station_longitude BETWEEN ? AND ?",
+                  min_latitude, max_latitude, min_longitude, max_longitude)
+        if min_altitude is not None:
+            where("max_altitude >= ?", min_altitude)
+        if max_pressure is not None:
+            where("min_pressure <= ?", max_pressure)
+        if kind is not None:
+            where("kind = ?", kind)
+        sql = "SELECT * FROM soundings"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY launch_time, path"
+        return self._connection.execute(sql, parameters).fetchall()
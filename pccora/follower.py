@@ -0,0 +1,150 @@
+"""
+Follow PC-CORA files still being written by the ground station.
+
+While a sounding is in progress the header ``file_ready`` value is ``NOT_READY``, and records are appended to the
+file. ``HiresFollower`` keeps the file open, decodes the header, identification and SYSPAR sections once, and then
+each ``poll()`` decodes only the records appended since the previous one.
+"""
+
+import os
+import time
+
+from construct import Array
+
+from .pccora import pccora_header, pccora_identification, pccora_syspar, pccora_data, IDENTIFICATION_OFFSET, \
+    SYSPAR_OFFSET, RECORDS_OFFSET, MAX_DATA_RECORDS, _HIRES_RECORDS, _header_counts, _check_kind, _check_options, \
+    _replace_missing, _read
+
+# Byte offset of the header ``file_ready`` value
+_FILE_READY_OFFSET = 32
+
+
+class HiresFollower(object):
+    """
+    Follows the high resolution records of a PC-CORA (EDT), S or Z file while it is written.
+
+    * ``header``, ``identification`` and ``syspar``, decoded once, when the file has them (``None`` before)
+    * ``data``, the data records of PC-CORA (EDT) files, once they are all written (``None`` before)
+    * ``poll()`` returns the high resolution records appended since the previous call
+    * ``follow()`` yields them, polling the file until it is ready
+
+    The number of data records is given by the header standard levels, or ``MAX_DATA_RECORDS`` when not valid
+    (see ``record_counts()``). ``engine`` and ``missing`` are the same as in ``PCCORAParser``: records are
+    returned as lists of construct Containers, or ``Columns`` with the numpy engine.
+    """
+
+    def __init__(self, file_arg, kind='edt', engine='construct', missing='sentinel'):
+        _check_kind(kind)
+        _check_options(engine, missing)
+        self.kind = kind
+        self.engine = engine
+        self.missing = missing
+        self.header = None
+        self.identification = None
+        self.syspar = None
+        self.data = None
+        self._record = _HIRES_RECORDS[kind]
+        self._offset = None
+        # unbuffered, so that bytes written after a read are always seen
+        self._fid = open(file_arg, 'rb', buffering=0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._fid.close()
+
+    @property
+    def offset(self):
+        """The byte offset of the next high resolution record, or ``None`` before the data records are read"""
+        return self._offset
+
+    @property
+    def ready(self):
+        """``True`` once the ground station marked the file as complete (header ``file_ready``)"""
+        self._fid.seek(_FILE_READY_OFFSET)
+        return self._fid.read(1) == b'\x01'
+
+    def _size(self):
+        return os.fstat(self._fid.fileno()).st_size
+
+    def _read_sections(self):
+        if self._size() < RECORDS_OFFSET:
+            return False
+        self._fid.seek(0)
+        sections = _read(self._fid, RECORDS_OFFSET)
+        header = pccora_header.parse(sections[:IDENTIFICATION_OFFSET])
+        self.identification = _replace_missing(
+            pccora_identification.parse(sections[IDENTIFICATION_OFFSET:SYSPAR_OFFSET]), self.missing)
+        self.syspar = pccora_syspar.parse(sections[SYSPAR_OFFSET:]).syspar
+        counts = _header_counts(header, self.kind)
+        self._data_count = counts[0] if counts is not None else MAX_DATA_RECORDS if self.kind == 'edt' else 0
+        self.header = _replace_missing(header, self.missing)
+        return True
+
+    def _read_data(self):
+        data_length = self._data_count * pccora_data.sizeof()
+        if self._size() < RECORDS_OFFSET + data_length:
+            return False
+        if self.kind == 'edt':
+            self._fid.seek(RECORDS_OFFSET)
+            self.data = self._decode(pccora_data, _read(self._fid, data_length), self._data_count, data=True)
+        self._offset = RECORDS_OFFSET + data_length
+        return True
+
+    def _decode(self, record, chunk, count, data=False):
+        if self.engine == 'numpy':
+            import numpy as np
+            from .numpy_engine import decode_records, DATA_DECODERS, HIRES_LAYOUTS
+            dtype, decoders = HIRES_LAYOUTS[self.kind]
+            return decode_records(np.frombuffer(chunk, dtype=dtype, count=count),
+                                  DATA_DECODERS if data else decoders, missing=self.missing)
+        if self.engine == 'struct':
+            from .struct_engine import data_layout, hires_layout, s_hires_layout, z_hires_layout
+            layouts = {'edt': hires_layout, 's': s_hires_layout, 'z': z_hires_layout}
+            layout = data_layout if data else layouts[self.kind]
+            records = layout.iter_unpack(chunk[:count * layout.size])
+        else:
+            records = list(Array(count, record).parse(chunk[:count * record.sizeof()]))
+        for container in records:
+            _replace_missing(container, self.missing)
+        return records
+
+    def poll(self):
+        """
+        Return the high resolution records appended since the previous call, without the last record if it is
+        still incomplete. Returns an empty list (or empty ``Columns``) when there are no new records.
+        """
+        if self._offset is None:
+            if self.header is None and not self._read_sections() or not self._read_data():
+                return self._decode(self._record, b'', 0)
+        count = (self._size() - self._offset) // self._record.sizeof()
+        self._fid.seek(self._offset)
+        chunk = _read(self._fid, count * self._record.sizeof())
+        # the file could have been truncated meanwhile
+        count = len(chunk) // self._record.sizeof()
+        self._offset += count * self._record.sizeof()
+        return self._decode(self._record, chunk, count)
+
+    def follow(self, interval=1.0, timeout=None):
+        """
+        Yield the new high resolution records every ``interval`` seconds, until the file is ready and every
+        record was yielded, or no records were appended for ``timeout`` seconds.
+        """
+        last_change = time.time()
+        while True:
+            # checked before polling, so that the records written before the file was marked as ready are read
+            ready = self.ready
+            records = self.poll()
+            if len(records) > 0:
+                last_change = time.time()
+                yield records
+            elif ready and self._offset is not None:
+                return
+            elif timeout is not None and time.time() - last_change > timeout:
+                return
+            else:
+                time.sleep(interval)
@@ -0,0 +1,235 @@
+"""
+NumPy decode engine for PC-CORA files.
+
+The fixed-size data and high resolution records are read with a single ``numpy.frombuffer`` call using a
+little-endian structured dtype, and the scaling applied by the construct ``ExprAdapter`` decoders is then applied
+to whole columns at once. The header, identification and SYSPAR sections are small, and are still decoded by
+construct so that both engines return exactly the same objects for them.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from construct import Container, RangeError
+
+from .pccora import pccora_header, pccora_identification, pccora_syspar, RECORDS_OFFSET, MAX_DATA_RECORDS, \
+    MISSING_VALUE, record_counts
+from .sounding import Columns, add_derived_columns
+
+_i2 = '<i2'
+
+# Layout shared by ``pccora_data`` and ``pccora_hires_data``.
+data_dtype = np.dtype([
+    ('time', '<f4'),
+    ('logarithmic_pressure', _i2),
+    ('temperature', _i2),
+    ('humidity', _i2),
+    ('north_wind', _i2),
+    ('east_wind', _i2),
+    ('altitude', _i2),
+    ('pressure', _i2),
+    ('dew_point_temperature', _i2),
+    ('mixing_ratio', _i2),
+    ('wind_direction', _i2),
+    ('wind_speed', _i2),
+    ('azimuth', _i2),
+    ('horizontal_distance', _i2),
+    ('longitude', _i2),
+    ('latitude', _i2),
+    # the two bytes of each significance key as one bit mask, see ``pccora.sounding.STANDARD_LEVEL``
+    ('significance_key', '<u2'),
+    ('recalculated_significance_key', '<u2'),
+    ('radar_height', _i2)
+])
+
+hires_dtype = data_dtype
+
+# Layout of ``pccora_s_hires_data`` and ``pccora_z_hires_data``, with the eight channel counts (c1 to c8) as one
+# ``counts`` field.
+s_hires_dtype = z_hires_dtype = np.dtype([
+    ('time', _i2),
+    ('logarithmic_pressure', _i2),
+    ('temperature', _i2),
+    ('humidity', _i2),
+    ('n_data', _i2),
+    ('counts', _i2, (8,)),
+    ('cycles', _i2),
+    ('not_used', _i2),
+    ('buffer', 'u1', (20,))
+])
+
+
+def _scale(factor):
+    def decoder(raw):
+        out = raw * factor
+        out[raw == MISSING_VALUE] = MISSING_VALUE
+        return out
+
+    return decoder
+
+
+def _offset(value):
+    def decoder(raw):
+        out = raw + value
+        out[raw == MISSING_VALUE] = MISSING_VALUE
+        return out
+
+    return decoder
+
+
+def _truncated_scale(factor):
+    def decoder(raw):
+        out = (raw * factor).astype(np.int64)
+        out[raw == MISSING_VALUE] = MISSING_VALUE
+        return out
+
+    return decoder
+
+
+# Column decoders, mirroring the ``ExprAdapter`` decoders of ``pccora_data``. Columns not listed are copied as-is.
+DATA_DECODERS = {
+    'temperature': _scale(0.1),
+    'north_wind': _scale(0.1),
+    'east_wind': _scale(0.1),
+    'altitude': _offset(30000.0),
+    'pressure': _scale(0.1),
+    'dew_point_temperature': _scale(0.1),
+    'wind_speed': _truncated_scale(0.01),
+    'longitude': _scale(0.1),
+    'latitude': _scale(0.1)
+}
+
+# The high resolution records also scale the mixing ratio.
+HIRES_DECODERS = dict(DATA_DECODERS, mixing_ratio=_scale(0.1))
+
+# Columns decoded from the raw records in addition to their fields, as (field, decoder): the wind speed with the
+# 0.01 m/s precision of the file, ``wind_speed`` being truncated to whole m/s like the ``pccora_data`` decoder.
+EXTRA_COLUMNS = {
+    'exact_wind_speed': ('wind_speed', _scale(0.01))
+}
+
+S_HIRES_DECODERS = Z_HIRES_DECODERS = {
+    'temperature': _scale(0.1)
+}
+
+# Record dtype and decoders of each kind of file, for the records following the data records (if any).
+HIRES_LAYOUTS = {
+    'edt': (hires_dtype, HIRES_DECODERS),
+    's': (s_hires_dtype, S_HIRES_DECODERS),
+    'z': (z_hires_dtype, Z_HIRES_DECODERS)
+}
+
+
+def apply_missing(column, is_missing, missing):
+    """
+    Apply the missing values policy (see ``PCCORAParser``) to a decoded column, in one pass. ``is_missing`` is
+    ``True`` where the raw value was ``MISSING_VALUE``. With ``nan``, integer columns are converted to float64.
+    """
+    if missing == 'nan':
+        column = column.astype(np.float64) if column.dtype.kind in 'iu' else column
+        column[is_missing] = np.nan
+    elif missing == 'mask':
+        column = np.ma.masked_array(column, mask=is_missing)
+    return column
+
+
+def _column_loader(records, name, decoder, missing):
+    def loader():
+        raw = np.array(records[name])
+        column = raw if decoder is None else decoder(raw.astype(np.float64))
+        # the significance keys are bit masks, and the S/Z buffer raw bytes, without missing values
+        if missing == 'sentinel' or raw.dtype.kind == 'u':
+            return column
+        return apply_missing(column, raw == MISSING_VALUE, missing)
+
+    return loader
+
+
+def decode_records(records, decoders, lazy=False, missing='sentinel'):
+    """
+    Decode an array of raw records (with ``data_dtype``) into ``Columns``, with the ``EXTRA_COLUMNS``. When ``lazy``
+    is ``True`` each field is only decoded when accessed, and the returned ``Columns`` keep a reference to
+    ``records`` until then.
+
+    The derived columns, like ``spress``, are always computed only when accessed.
+    """
+    loaders = OrderedDict((name, _column_loader(records, name, decoders.get(name), missing))
+                          for name in records.dtype.names)
+    for name, (field, decoder) in EXTRA_COLUMNS.items():
+        if field in records.dtype.names:
+            loaders[name] = _column_loader(records, field, decoder, missing)
+    if lazy:
+        columns = Columns.lazy(len(records), loaders)
+    else:
+        columns = Columns(OrderedDict((name, loader()) for name, loader in loaders.items()))
+    return add_derived_columns(columns)
+
+
+def decode_hires(buf, count=-1, missing='sentinel', kind='edt'):
+    """
+    Decode ``count`` high resolution records (all by default) of a PC-CORA (EDT), S or Z file from the start of
+    ``buf`` into ``Columns``.
+    """
+    dtype, decoders = HIRES_LAYOUTS[kind]
+    return decode_records(np.frombuffer(buf, dtype=dtype, count=count), decoders, missing=missing)
+
+
+def split_records(buf, offset=RECORDS_OFFSET, counts=None):
+    """
+    Return the raw data and hires records of a PC-CORA (EDT) file in ``buf`` as two structured arrays, without
+    copying. ``offset`` is where the first data record starts, and ``counts`` the number of data and hires records
+    (see ``record_counts()``), otherwise counted from the buffer size.
+    """
+    record_length = data_dtype.itemsize
+    if counts is None:
+        data_count = min(MAX_DATA_RECORDS, (len(buf) - offset) // record_length)
+        if data_count < 1:
+            raise RangeError("expected 1..%d, found %d" % (MAX_DATA_RECORDS, data_count))
+        hires_count = (len(buf) - offset) // record_length - data_count
+    else:
+        data_count, hires_count = counts
+    data = np.frombuffer(buf, dtype=data_dtype, count=data_count, offset=offset)
+    offset += data_count * record_length
+    hires = np.frombuffer(buf, dtype=hires_dtype, count=hires_count, offset=offset)
+    return data, hires
+
+
+def split_s_records(buf, offset=RECORDS_OFFSET, kind='s', count=None):
+    """
+    Return the raw records of a S or Z file in ``buf`` as a structured array, without copying. ``count`` is the
+    number of records, otherwise counted from the buffer size.
+    """
+    dtype = HIRES_LAYOUTS[kind][0]
+    if count is None:
+        count = max(0, len(buf) - offset) // dtype.itemsize
+    return np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+
+
+def parse_buffer(buf, missing='sentinel', kind='edt', counts=None):
+    """
+    Parse a PC-CORA (EDT), S or Z file already loaded in memory, returning a construct Container with the same keys
+    as ``pccora_file``, ``pccora_s_file`` or ``pccora_z_file``. The data and hires sections are ``Columns``, with
+    one NumPy array per field, except for the S/Z channel counts, stored as a single ``counts`` (records x 8) array.
+    ``counts`` is the number of data and hires records, by default given by ``record_counts()``.
+    """
+    offset = 0
+    header = pccora_header.parse(buf[offset:offset + pccora_header.sizeof()])
+    offset += pccora_header.sizeof()
+    identification = pccora_identification.parse(buf[offset:offset + pccora_identification.sizeof()])
+    offset += pccora_identification.sizeof()
+    syspar = pccora_syspar.parse(buf[offset:offset + pccora_syspar.sizeof()])
+    offset += pccora_syspar.sizeof()
+
+    result = Container(
+        pccora_header=header,
+        pccora_identification=identification,
+        pccora_syspar=syspar
+    )
+    data_count, hires_count = record_counts(header, kind, len(buf)) if counts is None else counts
+    if kind == 'edt':
+        data, hires = split_records(buf, offset, (data_count, hires_count))
+        result['pccora_data'] = decode_records(data, DATA_DECODERS, missing=missing)
+    else:
+        hires = split_s_records(buf, offset, kind, hires_count)
+    result['pccora_hires_data'] = decode_records(hires, HIRES_LAYOUTS[kind][1], missing=missing)
+    return result
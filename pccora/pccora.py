@@ -1,8 +1,11 @@
 import math
+import os
+import warnings
+from collections import namedtuple
 from datetime import datetime, timedelta
 
 from construct import Struct, ExprAdapter, String, SLInt16, SLInt32, Enum, Byte, Bytes, Value, LFloat32, Range, \
-    OptionalGreedyRange
+    OptionalGreedyRange, Array, Container, FieldError, RangeError
 
 # ===============================================================================
 # Construct parser objects
@@ -371,10 +374,309 @@ pccora_z_file = Struct("pccora_z_hires_data",
                        )
 
 
+_FILES = {
+    'edt': pccora_file,
+    's': pccora_s_file,
+    'z': pccora_z_file
+}
+
+KINDS = ('edt', 's', 'z')
+
+# Record of each kind of file, following the data records (if any).
+_HIRES_RECORDS = {
+    'edt': pccora_hires_data,
+    's': pccora_s_hires_data,
+    'z': pccora_z_hires_data
+}
+
+# Only the leading header and identification sections, for when the records are not needed.
+pccora_metadata = Struct("pccora_metadata",
+                         pccora_header,
+                         pccora_identification
+                         )
+
+# The header, identification and SYSPAR sections have fixed lengths, so the data records always start at the
+# same byte offset.
+IDENTIFICATION_OFFSET = pccora_header.sizeof()
+SYSPAR_OFFSET = IDENTIFICATION_OFFSET + pccora_identification.sizeof()
+RECORDS_OFFSET = SYSPAR_OFFSET + pccora_syspar.sizeof()
+
+# At most 25 standard level records precede the high resolution records, see ``pccora_file``.
+MAX_DATA_RECORDS = 25
+
+ENGINES = ('construct', 'numpy', 'struct')
+
+# Value used in PC-CORA files for missing values, and how the parser may return them instead.
+MISSING_VALUE = -32768
+MISSING_POLICIES = ('sentinel', 'nan', 'mask')
+
+# Result of the ``parse_*`` functions. ``syspar`` is the SYSPAR bytes, and ``data`` and ``hires`` the records, as
+# tuples of construct Containers, or ``Columns`` with the numpy engine. ``data`` is ``None`` for S and Z files.
+PCCORAResult = namedtuple('PCCORAResult', ['header', 'identification', 'syspar', 'data', 'hires'])
+
+
+def read_metadata(file_arg):
+    """
+    Read only the header and identification sections of a PC-CORA (EDT), S or Z file.
+
+    Only the first bytes of the file are read, and the returned construct Container has the ``pccora_header`` and
+    ``pccora_identification`` keys, the latter including ``datetime`` and ``launch_time``.
+    """
+    with open(file_arg, 'rb') as fid:
+        return pccora_metadata.parse(fid.read(SYSPAR_OFFSET))
+
+
+def _read(stream, size):
+    """
+    Read ``size`` bytes from a stream, which may return less bytes per call when it is not a regular file.
+    Returns less than ``size`` bytes only at the end of the stream.
+    """
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class HeaderMismatchWarning(UserWarning):
+    """
+    The record counts in the header of a PC-CORA file do not match the records in the file.
+    """
+
+
+def _header_counts(header, kind):
+    """
+    Return the number of data and high resolution records given by the header, or ``None`` if they are not valid
+    for this kind of file. In PC-CORA (EDT) files the data records are the standard levels.
+    """
+    if header.data_length != _HIRES_RECORDS[kind].sizeof() or header.data_records < 0:
+        return None
+    if kind != 'edt':
+        return 0, header.data_records
+    if not 1 <= header.standard_levels <= MAX_DATA_RECORDS:
+        return None
+    return header.standard_levels, header.data_records
+
+
+def _counts_from_size(header, kind, file_size):
+    """
+    Return the number of data and high resolution records of a file counted from its size: for PC-CORA (EDT) files,
+    the data records given by the header when ``standard_levels`` and ``data_length`` are valid, otherwise up to
+    ``MAX_DATA_RECORDS`` like the ``pccora_file`` greedy ranges, then as many complete high resolution records as
+    the file has.
+    """
+    complete = max(0, file_size - RECORDS_OFFSET) // _HIRES_RECORDS[kind].sizeof()
+    if kind != 'edt':
+        return 0, complete
+    data_count = header.standard_levels
+    if header.data_length != pccora_data.sizeof() or not 1 <= data_count <= min(MAX_DATA_RECORDS, complete):
+        data_count = min(MAX_DATA_RECORDS, complete)
+    return data_count, complete - data_count
+
+
+def record_counts(header, kind, file_size):
+    """
+    Return how many data and high resolution records a PC-CORA (EDT), S or Z file of ``file_size`` bytes has,
+    from the ``data_records``, ``standard_levels`` and ``data_length`` values of its (raw) header.
+
+    When the header does not match the file size, a ``HeaderMismatchWarning`` is issued, and the records are
+    counted from the file size instead, see ``_counts_from_size()``.
+    """
+    record_length = _HIRES_RECORDS[kind].sizeof()
+    available = max(0, file_size - RECORDS_OFFSET)
+    counts = _header_counts(header, kind)
+    if counts is not None and sum(counts) * record_length == available:
+        return counts
+
+    warnings.warn("The header has data_records=%s, standard_levels=%s and data_length=%s, which do not match the "
+                  "%d bytes of %s records, counting the records from the file size" %
+                  (header.data_records, header.standard_levels, header.data_length, available, kind.upper()),
+                  HeaderMismatchWarning)
+    counts = _counts_from_size(header, kind, file_size)
+    if kind == 'edt' and counts[0] < 1:
+        raise RangeError("expected 1..%d, found 0" % MAX_DATA_RECORDS)
+    return counts
+
+
+def _hires_range(fid):
+    """
+    Return the byte offset of the first high resolution record of a PC-CORA (EDT) file, and how many records
+    there are, from its header, see ``record_counts()``.
+    """
+    header = pccora_header.parse(_read(fid, IDENTIFICATION_OFFSET))
+    data_count, hires_count = record_counts(header, 'edt', os.fstat(fid.fileno()).st_size)
+    return RECORDS_OFFSET + data_count * pccora_data.sizeof(), hires_count
+
+
+def _parse_construct(buf, kind, counts=None):
+    """
+    Parse a whole file with the construct structs, reading exactly the number of records given by
+    ``record_counts()`` (or ``counts``), instead of the greedy ranges of ``pccora_file``.
+    """
+    header = pccora_header.parse(buf[:IDENTIFICATION_OFFSET])
+    data_count, hires_count = record_counts(header, kind, len(buf)) if counts is None else counts
+    result = Container(
+        pccora_header=header,
+        pccora_identification=pccora_identification.parse(buf[IDENTIFICATION_OFFSET:SYSPAR_OFFSET]),
+        pccora_syspar=pccora_syspar.parse(buf[SYSPAR_OFFSET:RECORDS_OFFSET])
+    )
+    offset = RECORDS_OFFSET
+    if kind == 'edt':
+        result['pccora_data'] = Array(data_count, pccora_data).parse(
+            buf[offset:offset + data_count * pccora_data.sizeof()])
+        offset += data_count * pccora_data.sizeof()
+    hires = _HIRES_RECORDS[kind]
+    result['pccora_hires_data'] = Array(hires_count, hires).parse(buf[offset:offset + hires_count * hires.sizeof()])
+    return result
+
+
+def _replace_missing(container, missing):
+    """
+    Replace, in place, the ``MISSING_VALUE`` values of a construct Container following the missing values policy.
+    """
+    if missing == 'sentinel':
+        return container
+    if missing == 'nan':
+        replacement = float('nan')
+    else:
+        import numpy
+        replacement = numpy.ma.masked
+    # spress is computed from the logarithmic pressure, so it is missing too
+    spress_missing = container.get('logarithmic_pressure') == MISSING_VALUE
+    for key in container.keys():
+        value = container[key]
+        if isinstance(value, (int, float)) and value == MISSING_VALUE or key == 'spress' and spress_missing:
+            container[key] = replacement
+    return container
+
+
+def _check_kind(kind):
+    if kind not in KINDS:
+        raise ValueError("Invalid kind '%s', must be one of %s" % (kind, ', '.join(KINDS)))
+
+
+def _check_missing(missing):
+    if missing not in MISSING_POLICIES:
+        raise ValueError("Invalid missing '%s', must be one of %s" % (missing, ', '.join(MISSING_POLICIES)))
+
+
+def _check_options(engine, missing):
+    if engine not in ENGINES:
+        raise ValueError("Invalid engine '%s', must be one of %s" % (engine, ', '.join(ENGINES)))
+    _check_missing(missing)
+
+
+def _decode(buf, kind, engine, missing, counts=None):
+    """
+    Decode a whole PC-CORA (EDT), S or Z file, returning the same construct Container as ``pccora_file``,
+    ``pccora_s_file`` or ``pccora_z_file``, with the missing values policy applied. ``counts`` is the number of
+    data and hires records to decode, by default given by ``record_counts()``.
+    """
+    if engine == 'numpy':
+        from .numpy_engine import parse_buffer
+        result = parse_buffer(buf, missing, kind, counts)
+    elif engine == 'struct':
+        from .struct_engine import parse_buffer
+        result = parse_buffer(buf, kind, counts)
+    else:
+        result = _parse_construct(buf, kind, counts)
+
+    if missing != 'sentinel':
+        _replace_missing(result.pccora_header, missing)
+        _replace_missing(result.pccora_identification, missing)
+        for key in ('pccora_data', 'pccora_hires_data'):
+            if isinstance(result.get(key), list):
+                for record in result[key]:
+                    _replace_missing(record, missing)
+    return result
+
+
+def _byte_view(buf):
+    """
+    Return a flat, read-only, unsigned bytes ``memoryview`` over any contiguous buffer-protocol object (``bytes``,
+    ``bytearray``, ``mmap``, NumPy arrays, ...), without copying it.
+    """
+    view = memoryview(buf)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view.toreadonly() if hasattr(view, 'toreadonly') else view
+
+
+def _freeze(records):
+    return tuple(records) if isinstance(records, list) else records
+
+
+def parse_bytes(buf, kind='edt', engine='construct', missing='sentinel'):
+    """
+    Parse a PC-CORA (EDT), S or Z (``kind``) file already in memory, returning a ``PCCORAResult``.
+
+    ``buf`` is any contiguous buffer-protocol object, like ``bytes``, ``bytearray``, a ``memoryview`` or an
+    ``mmap``. The numpy and struct engines decode straight from it, without copying it first, and the result does
+    not reference it, so it may be modified or closed afterwards.
+
+    Like the other ``parse_*`` functions, it has no state, so it is safe to call from many threads at once.
+    ``engine`` and ``missing`` are the same as in ``PCCORAParser``.
+    """
+    _check_kind(kind)
+    _check_options(engine, missing)
+    view = _byte_view(buf)
+    try:
+        return _to_result(_decode(view, kind, engine, missing))
+    finally:
+        view.release()
+
+
+def _to_result(result):
+    return PCCORAResult(
+        header=result.pccora_header,
+        identification=result.pccora_identification,
+        syspar=result.pccora_syspar.syspar,
+        data=_freeze(result.get('pccora_data')),
+        hires=_freeze(result.pccora_hires_data)
+    )
+
+
+def parse_edt(file_arg, engine='construct', missing='sentinel'):
+    """Parse a PC-CORA (EDT) file, returning a ``PCCORAResult``, see ``parse_bytes()``"""
+    with open(file_arg, 'rb') as fid:
+        return parse_bytes(fid.read(), 'edt', engine, missing)
+
+
+def parse_s(file_arg, engine='construct', missing='sentinel'):
+    """Parse an S file, returning a ``PCCORAResult``, see ``parse_bytes()``"""
+    with open(file_arg, 'rb') as fid:
+        return parse_bytes(fid.read(), 's', engine, missing)
+
+
+def parse_z(file_arg, engine='construct', missing='sentinel'):
+    """Parse a Z file, returning a ``PCCORAResult``, see ``parse_bytes()``"""
+    with open(file_arg, 'rb') as fid:
+        return parse_bytes(fid.read(), 'z', engine, missing)
+
+
 class PCCORAParser(object):
     """
     A PC-CORA parser, that uses the construct binary parser library to read the input data.
 
+    The ``engine`` argument selects how the data and high resolution records are decoded.
+
+    * ``construct`` (default) decodes each record into a construct Container.
+    * ``numpy`` decodes each section with a single ``numpy.frombuffer`` call, and ``get_data()`` and
+      ``get_hires_data()`` return ``Columns`` (one NumPy array per field) instead. The eight channel counts of S
+      and Z files are a single ``counts`` array (records x 8). Requires NumPy.
+    * ``struct`` decodes each section with precompiled ``struct.Struct`` formats, returning the same construct
+      Containers as the ``construct`` engine, much faster and without any other dependency.
+
+    The ``missing`` argument selects how values missing in the file (``MISSING_VALUE``, -32768) are returned, in
+    every section.
+
+    * ``sentinel`` (default) returns them as -32768.
+    * ``nan`` returns them as NaN. Integer ``Columns`` are converted to float64.
+    * ``mask`` returns them as ``numpy.ma.masked``, and ``Columns`` as NumPy masked arrays. Requires NumPy.
+
     Users may call one of the two following methods to parse either a file (that will be read with the 'rb' flag),
     or a file resource.
 
@@ -393,37 +695,157 @@ class PCCORAParser(object):
     Or to get the whole result.
 
     * ``get_result()``
+    * ``get_sounding()``, which returns a columnar ``Sounding`` with any engine (requires NumPy)
+
+    A parser instance keeps its last result, so it must not be shared between threads. The ``parse_edt()``,
+    ``parse_s()``, ``parse_z()`` and ``parse_bytes()`` functions have no state, and return a ``PCCORAResult``
+    instead.
+
+    For long soundings, ``iter_hires()`` yields the high resolution records as they are read, and
+    ``hires_record()`` and ``hires_slice()`` seek straight to the requested records. Neither fills the 'result'
+    object.
     """
 
-    def __init__(self):
+    def __init__(self, engine='construct', missing='sentinel'):
+        _check_options(engine, missing)
+        self.engine = engine
+        self.missing = missing
         self.result = None
 
+    def _parse_stream(self, stream, kind):
+        return _decode(stream.read(), kind, self.engine, self.missing)
+
+    def _parse_hires_records(self, chunk, count):
+        """Decode ``count`` high resolution records from the start of ``chunk`` as construct Containers"""
+        record_length = pccora_hires_data.sizeof()
+        if self.engine == 'struct':
+            from .struct_engine import hires_layout
+            records = hires_layout.iter_unpack(chunk[:count * record_length])
+        else:
+            records = [pccora_hires_data.parse(chunk[i * record_length:(i + 1) * record_length])
+                       for i in range(0, count)]
+        for record in records:
+            _replace_missing(record, self.missing)
+        return records
+
+    def _decode_hires_columns(self, chunk, count):
+        from .numpy_engine import decode_hires
+        return decode_hires(chunk, count, self.missing)
+
     def parse_file(self, file_arg):
         """
-        Parse a file, by opening it with 'rb' flags and sending it through the construct binary parser.
+        Parse a file, by opening it with 'rb' flags and sending it through the selected engine.
         """
         with open(file_arg, 'rb') as fid:
-            self.result = pccora_file.parse_stream(fid)
+            self.result = self._parse_stream(fid, 'edt')
 
     def parse_s_file(self, file_arg):
         """
-        Parse an S file, by opening it with 'rb' flags and sending it through the construct binary parser.
+        Parse an S file, by opening it with 'rb' flags and sending it through the selected engine.
         """
         with open(file_arg, 'rb') as fid:
-            self.result = pccora_s_file.parse_stream(fid)
+            self.result = self._parse_stream(fid, 's')
 
     def parse_z_file(self, file_arg):
         """
-        Parse a Z file, by opening it with 'rb' flags and sending it through the construct binary parser.
+        Parse a Z file, by opening it with 'rb' flags and sending it through the selected engine.
+        """
+        with open(file_arg, 'rb') as fid:
+            self.result = self._parse_stream(fid, 'z')
+
+    def iter_hires(self, file_arg, batch_size=None):
+        """
+        Iterate over the high resolution records of a PC-CORA (EDT) file, reading at most one batch of records in
+        memory at a time. ``file_arg`` may be a file name, or a binary stream that does not need to be seekable.
+
+        Without ``batch_size``, each record is yielded as a construct Container. Otherwise, lists of up to
+        ``batch_size`` records are yielded, or ``Columns`` with the ``numpy`` engine.
+
+        The number of records is given by the header (see ``record_counts()``). The size of a stream is not known,
+        so its header is trusted when valid, and its records otherwise read until the end of the stream.
+        """
+        if hasattr(file_arg, 'read'):
+            for records in self._iter_hires_stream(file_arg, batch_size):
+                yield records
+        else:
+            with open(file_arg, 'rb') as fid:
+                for records in self._iter_hires_stream(fid, batch_size, os.fstat(fid.fileno()).st_size):
+                    yield records
+
+    def _iter_hires_stream(self, stream, batch_size, file_size=None):
+        record_length = pccora_hires_data.sizeof()
+        sections = _read(stream, RECORDS_OFFSET)
+        if len(sections) < RECORDS_OFFSET:
+            raise FieldError("expected %d bytes for the header, identification and SYSPAR" % RECORDS_OFFSET)
+        header = pccora_header.parse(sections[:IDENTIFICATION_OFFSET])
+        if file_size is not None:
+            counts = record_counts(header, 'edt', file_size)
+        else:
+            counts = _header_counts(header, 'edt')
+        data_count, remaining = counts if counts is not None else (MAX_DATA_RECORDS, None)
+        data = _read(stream, data_count * pccora_data.sizeof())
+        if len(data) < pccora_data.sizeof():
+            raise RangeError("expected 1..%d, found 0" % MAX_DATA_RECORDS)
+        if len(data) < data_count * pccora_data.sizeof():
+            # the stream ended before the hires records, any leftover is part of an incomplete data record
+            return
+
+        records_per_read = batch_size or 1024
+        while remaining is None or remaining > 0:
+            if remaining is not None:
+                records_per_read = min(records_per_read, remaining)
+                remaining -= records_per_read
+            chunk = _read(stream, records_per_read * record_length)
+            count = len(chunk) // record_length
+            if count == 0:
+                return
+            if batch_size is None:
+                for record in self._parse_hires_records(chunk, count):
+                    yield record
+            elif self.engine == 'numpy':
+                yield self._decode_hires_columns(chunk, count)
+            else:
+                yield self._parse_hires_records(chunk, count)
+            if count < records_per_read:
+                return
+
+    def hires_record(self, file_arg, index):
+        """
+        Read only the high resolution record at ``index`` (negative indexes count from the end) of a PC-CORA
+        (EDT) file, as a construct Container.
+        """
+        with open(file_arg, 'rb') as fid:
+            offset, count = _hires_range(fid)
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError("hires record index out of range")
+            record_length = pccora_hires_data.sizeof()
+            fid.seek(offset + index * record_length)
+            return self._parse_hires_records(fid.read(record_length), 1)[0]
+
+    def hires_slice(self, file_arg, start=None, stop=None):
+        """
+        Read only the high resolution records from ``start`` to ``stop`` of a PC-CORA (EDT) file, with the same
+        semantics as slicing a list. Returns a list of construct Containers, or ``Columns`` with the ``numpy``
+        engine.
         """
         with open(file_arg, 'rb') as fid:
-            self.result = pccora_z_file.parse_stream(fid)
+            offset, count = _hires_range(fid)
+            start, stop, _ = slice(start, stop).indices(count)
+            count = max(0, stop - start)
+            record_length = pccora_hires_data.sizeof()
+            fid.seek(offset + start * record_length)
+            chunk = fid.read(count * record_length)
+        if self.engine == 'numpy':
+            return self._decode_hires_columns(chunk, count)
+        return self._parse_hires_records(chunk, count)
 
     def parse_stream(self, stream_arg):
         """
-        Parse a file, by passing the stream argument through the construct binary parser.
+        Parse a file, by passing the stream argument through the selected engine.
         """
-        self.result = pccora_file.parse_stream(stream_arg)
+        self.result = self._parse_stream(stream_arg, 'edt')
 
     def get_result(self):
         """Return the parser result"""
@@ -448,3 +870,8 @@ class PCCORAParser(object):
     def get_hires_data(self):
         """Return the PC-CORA file high resolution data array"""
         return self.result.pccora_hires_data
+
+    def get_sounding(self):
+        """Return the parser result as a columnar Sounding, with one array per field"""
+        from .sounding import Sounding
+        return Sounding.from_result(_to_result(self.result))
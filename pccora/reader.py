@@ -0,0 +1,168 @@
+"""
+Memory-mapped PC-CORA reader.
+
+The file is mapped once, and each section is exposed as a zero-copy ``memoryview`` over the mapping. Header and
+identification are decoded, and records converted into columns, only when accessed.
+"""
+
+import mmap
+
+from .pccora import pccora_header, pccora_identification, IDENTIFICATION_OFFSET, SYSPAR_OFFSET, RECORDS_OFFSET, \
+    _check_kind, _check_missing, _replace_missing, parse_bytes, record_counts
+
+
+def _release(view):
+    # a view still exported cannot be released, it is left to the garbage collector
+    try:
+        view.release()
+    except BufferError:
+        pass
+
+
+class PCCORAReader(object):
+    """
+    A memory-mapped PC-CORA file reader, for PC-CORA (EDT), S and Z files.
+
+    The mapping is closed by ``close()``, or when leaving the ``with`` block. Columns already accessed remain
+    valid after that, but the views returned by ``get_*_view()`` are released.
+
+    * ``header``, the decoded PC-CORA file header
+    * ``identification``, the decoded PC-CORA file identification
+    * ``syspar``, a view over the SYSPAR bytes
+    * ``records``, a view over all the data records
+    * ``data`` and ``hires``, the data (EDT only) and high resolution records as lazy ``Columns`` (requires NumPy)
+
+    ``missing`` is the missing values policy, as in ``PCCORAParser``.
+
+    ``parse()`` decodes the whole mapped file at once, with ``parse_bytes()``.
+    """
+
+    def __init__(self, file_arg, kind='edt', missing='sentinel'):
+        _check_kind(kind)
+        _check_missing(missing)
+        self.kind = kind
+        self.missing = missing
+        self._views = {}
+        self._columns = []
+        self._header = None
+        self._identification = None
+        self._data = None
+        self._hires = None
+        with open(file_arg, 'rb') as fid:
+            self._mmap = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._mmap is None
+
+    def close(self):
+        """
+        Release every view and column loader referencing the mapping, then close it. Views still exported, e.g. to
+        ``numpy.frombuffer()`` arrays, cannot be released: the reader is closed anyway, and the mapping is only
+        closed once they are deleted.
+        """
+        if self.closed:
+            return
+        for columns in self._columns:
+            columns.release()
+        self._columns = []
+        self._data = None
+        self._hires = None
+        for view in self._views.values():
+            _release(view)
+        self._views = {}
+        _release(self._buffer)
+        self._buffer = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # the exported views keep a reference to the mapping, which is closed when the last one is deleted
+            pass
+        self._mmap = None
+
+    def _view(self, start, stop=None):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        view = self._views.get((start, stop))
+        if view is None:
+            view = self._buffer[start:stop]
+            self._views[(start, stop)] = view
+        return view
+
+    def parse(self, engine='numpy'):
+        """
+        Parse the whole mapped file with ``parse_bytes()``, returning a ``PCCORAResult``, which remains valid after
+        the reader is closed.
+        """
+        return parse_bytes(self._view(0), self.kind, engine, self.missing)
+
+    def get_header_view(self):
+        """Return a view over the header bytes"""
+        return self._view(0, IDENTIFICATION_OFFSET)
+
+    def get_identification_view(self):
+        """Return a view over the identification bytes"""
+        return self._view(IDENTIFICATION_OFFSET, SYSPAR_OFFSET)
+
+    def get_syspar_view(self):
+        """Return a view over the SYSPAR bytes"""
+        return self._view(SYSPAR_OFFSET, RECORDS_OFFSET)
+
+    def get_records_view(self):
+        """Return a view over the data records bytes, until the end of the file"""
+        return self._view(RECORDS_OFFSET)
+
+    @property
+    def header(self):
+        if self._header is None:
+            self._header = _replace_missing(pccora_header.parse(self.get_header_view().tobytes()), self.missing)
+        return self._header
+
+    @property
+    def identification(self):
+        if self._identification is None:
+            self._identification = _replace_missing(
+                pccora_identification.parse(self.get_identification_view().tobytes()), self.missing)
+        return self._identification
+
+    @property
+    def syspar(self):
+        return self.get_syspar_view()
+
+    @property
+    def records(self):
+        return self.get_records_view()
+
+    def _load_columns(self):
+        from .numpy_engine import split_records, split_s_records, decode_records, DATA_DECODERS, HIRES_LAYOUTS
+        # the raw header, as the missing values policy may have replaced its values
+        counts = record_counts(pccora_header.parse(self.get_header_view().tobytes()), self.kind, len(self._buffer))
+        if self.kind == 'edt':
+            data, hires = split_records(self.get_records_view(), 0, counts)
+            self._data = decode_records(data, DATA_DECODERS, lazy=True, missing=self.missing)
+            self._columns.append(self._data)
+        else:
+            hires = split_s_records(self.get_records_view(), 0, self.kind, counts[1])
+        self._hires = decode_records(hires, HIRES_LAYOUTS[self.kind][1], lazy=True, missing=self.missing)
+        self._columns.append(self._hires)
+
+    @property
+    def data(self):
+        if self.kind != 'edt':
+            raise ValueError("S and Z files have no data records")
+        if self._data is None:
+            self._load_columns()
+        return self._data
+
+    @property
+    def hires(self):
+        if self._hires is None:
+            self._load_columns()
+        return self._hires
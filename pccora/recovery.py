@@ -0,0 +1,191 @@
+"""
+Tolerant parsing of truncated and corrupt PC-CORA files.
+
+Instead of failing, or decoding garbage, ``recover_bytes()`` checks each fixed-size record with a few cheap tests
+(elapsed time valid and not decreasing, and pressure, temperature and humidity within plausible ranges), and
+decodes only the records before the first problem found. The problems are reported with their byte offset in the
+file. The usual ``parse_*`` functions do not run these checks, so clean files are parsed as fast as before.
+"""
+
+import math
+import struct
+from collections import namedtuple
+
+from construct import FieldError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .pccora import pccora_header, pccora_data, pccora_hires_data, pccora_s_hires_data, IDENTIFICATION_OFFSET, \
+    RECORDS_OFFSET, MISSING_VALUE, _header_counts, _counts_from_size, _check_kind, _check_options, _byte_view, \
+    _decode, _to_result
+
+# A problem found in a file: its byte offset, and a description.
+Problem = namedtuple('Problem', ['offset', 'reason'])
+
+# Largest plausible elapsed time, in seconds
+MAX_ELAPSED_TIME = 86400
+
+# Largest plausible logarithmic pressure, 4096 * ln(1200 hPa)
+MAX_LOGARITHMIC_PRESSURE = 29040
+
+# Time, logarithmic pressure, temperature and humidity, at the start of each record
+_EDT_FIELDS = struct.Struct('<fhhh')
+_S_FIELDS = struct.Struct('<hhhh')
+
+# Plausible temperatures (in degrees Celsius for PC-CORA (EDT) files, and either Celsius or Kelvin for S and Z
+# files) and humidities (only for PC-CORA (EDT) files), before scaling.
+_TEMPERATURES = {
+    'edt': (-1200, 600),
+    's': (-1500, 3500),
+    'z': (-1500, 3500)
+}
+_HUMIDITIES = {
+    'edt': (0, 110),
+    's': None,
+    'z': None
+}
+
+
+def _record_length(kind):
+    return pccora_hires_data.sizeof() if kind == 'edt' else pccora_s_hires_data.sizeof()
+
+
+def _check_record(values, kind, last_time):
+    """Return why the record ``values`` are not plausible, or ``None``"""
+    time, logarithmic_pressure, temperature, humidity = values
+    # also false for NaN
+    if not 0 <= time <= MAX_ELAPSED_TIME:
+        return "invalid time %r" % time
+    if time < last_time:
+        return "time %r before the time of the previous record %r" % (time, last_time)
+    if logarithmic_pressure != MISSING_VALUE and not 0 <= logarithmic_pressure <= MAX_LOGARITHMIC_PRESSURE:
+        return "invalid logarithmic pressure %d" % logarithmic_pressure
+    low, high = _TEMPERATURES[kind]
+    if temperature != MISSING_VALUE and not low <= temperature <= high:
+        return "invalid temperature %d" % temperature
+    humidities = _HUMIDITIES[kind]
+    if humidities is not None and humidity != MISSING_VALUE and not humidities[0] <= humidity <= humidities[1]:
+        return "invalid humidity %d" % humidity
+    return None
+
+
+def _records_dtype(kind):
+    # the fields of ``_EDT_FIELDS`` or ``_S_FIELDS``, skipping the rest of each record
+    time_format = '<f4' if kind == 'edt' else '<i2'
+    time_size = np.dtype(time_format).itemsize
+    return np.dtype({'names': ['time', 'logarithmic_pressure', 'temperature', 'humidity'],
+                     'formats': [time_format, '<i2', '<i2', '<i2'],
+                     'offsets': [0, time_size, time_size + 2, time_size + 4],
+                     'itemsize': _record_length(kind)})
+
+
+def _out_of_range(column, low, high):
+    return (column != MISSING_VALUE) & ((column < low) | (column > high))
+
+
+def _first_implausible(buf, offset, count, kind):
+    """The index of the first record that is not plausible, or ``count``, checking whole columns with NumPy"""
+    records = np.frombuffer(buf, dtype=_records_dtype(kind), count=count, offset=offset)
+    time = records['time'].astype(np.float64)
+    # also true for NaN
+    implausible = ~((time >= 0) & (time <= MAX_ELAPSED_TIME))
+    implausible[1:] |= time[1:] < time[:-1]
+    implausible |= _out_of_range(records['logarithmic_pressure'], 0, MAX_LOGARITHMIC_PRESSURE)
+    implausible |= _out_of_range(records['temperature'], *_TEMPERATURES[kind])
+    if _HUMIDITIES[kind] is not None:
+        implausible |= _out_of_range(records['humidity'], *_HUMIDITIES[kind])
+    return int(np.argmax(implausible)) if implausible.any() else count
+
+
+def check_records(buf, offset, count, kind='edt'):
+    """
+    Check ``count`` records of a PC-CORA (EDT), S or Z file, starting at byte ``offset`` of ``buf``. Returns the
+    number of records before the first one that is not plausible, and a ``Problem`` for it, or ``None``.
+
+    The records are checked a column at a time with NumPy when it is installed, otherwise one at a time.
+    """
+    fields = _EDT_FIELDS if kind == 'edt' else _S_FIELDS
+    record_length = _record_length(kind)
+    last_time = -math.inf
+    start = 0
+    if np is not None and count:
+        start = _first_implausible(buf, offset, count, kind)
+        if start == count:
+            return count, None
+        if start:
+            last_time = fields.unpack_from(buf, offset + (start - 1) * record_length)[0]
+    for index in range(start, count):
+        record_offset = offset + index * record_length
+        values = fields.unpack_from(buf, record_offset)
+        reason = _check_record(values, kind, last_time)
+        if reason is not None:
+            return index, Problem(record_offset, "record %d: %s" % (index, reason))
+        last_time = values[0]
+    return count, None
+
+
+def _available_counts(header, kind, size, problems):
+    """
+    Return the number of data and hires records to check, from the header when it fits in the file, otherwise
+    from the file size. Mismatches are added to ``problems``.
+    """
+    record_length = _record_length(kind)
+    available = max(0, size - RECORDS_OFFSET)
+    complete = available // record_length
+    if available % record_length:
+        problems.append(Problem(RECORDS_OFFSET + complete * record_length,
+                                "incomplete record of %d bytes" % (available % record_length)))
+
+    counts = _header_counts(header, kind)
+    if counts is not None and sum(counts) != complete:
+        problems.append(Problem(RECORDS_OFFSET + min(sum(counts), complete) * record_length,
+                                "the header has %d records, the file %d" % (sum(counts), complete)))
+    if counts is not None and sum(counts) <= complete:
+        return counts
+    return _counts_from_size(header, kind, size)
+
+
+def recover_bytes(buf, kind='edt', engine='construct', missing='sentinel'):
+    """
+    Parse a PC-CORA (EDT), S or Z (``kind``) file already in memory, like ``parse_bytes()``, keeping only the
+    records before the first truncated or implausible record. Returns a ``PCCORAResult``, and the list of
+    ``Problem`` found, empty for a clean file.
+
+    The header, identification and SYSPAR sections must be complete, otherwise ``FieldError`` is raised.
+    """
+    _check_kind(kind)
+    _check_options(engine, missing)
+    view = _byte_view(buf)
+    try:
+        if len(view) < RECORDS_OFFSET:
+            raise FieldError("expected %d bytes for the header, identification and SYSPAR, found %d" %
+                             (RECORDS_OFFSET, len(view)))
+        problems = []
+        header = pccora_header.parse(view[:IDENTIFICATION_OFFSET])
+        data_count, hires_count = _available_counts(header, kind, len(view), problems)
+
+        offset = RECORDS_OFFSET
+        if data_count:
+            valid, problem = check_records(view, offset, data_count, kind)
+            if problem is not None:
+                problems.append(problem)
+                data_count, hires_count = valid, 0
+            offset += data_count * pccora_data.sizeof()
+        if hires_count:
+            hires_count, problem = check_records(view, offset, hires_count, kind)
+            if problem is not None:
+                problems.append(problem)
+
+        result = _to_result(_decode(view, kind, engine, missing, (data_count, hires_count)))
+        return result, sorted(problems)
+    finally:
+        view.release()
+
+
+def recover_file(file_arg, kind='edt', engine='construct', missing='sentinel'):
+    """Parse a file with ``recover_bytes()``"""
+    with open(file_arg, 'rb') as fid:
+        return recover_bytes(fid.read(), kind, engine, missing)
@@ -0,0 +1,199 @@
+"""
+Scan archives of PC-CORA files, reading only their header and identification sections.
+
+Only the first ``SYSPAR_OFFSET`` bytes of each file are read, by a pool of threads, and decoded with the ``struct``
+engine layouts, so scanning is bound by the file system rather than by decoding. The result is a
+``MetadataTable``, with one row per file, which can be written as CSV, or converted into NumPy arrays.
+"""
+
+import csv
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from .pccora import SYSPAR_OFFSET, IDENTIFICATION_OFFSET, RECORDS_OFFSET, _HIRES_RECORDS, _header_counts, \
+    _counts_from_size, _check_kind
+from .struct_engine import header_layout, identification_layout
+
+# Default names of PC-CORA files: ``.EDT``, or two digits followed by E, S or Z, like ``93011809.21S``
+FILE_NAME_REGEX = r'.*\.(edt|[0-9]{2}[esz])$'
+
+# Columns of the table, and the header or identification value of each, if any
+COLUMNS = OrderedDict([
+    ('path', None),
+    ('kind', None),
+    ('size', None),
+    ('station_type', 'station_type'),
+    ('wmo_block_number', 'wmo_block_number'),
+    ('wmo_station_number', 'wmo_station_number'),
+    ('station_latitude', 'station_latitude'),
+    ('station_longitude', 'station_longitude'),
+    ('station_altitude', 'station_altitude'),
+    ('datetime', None),
+    ('launch_time', None),
+    ('radiosonde_number', 'radiosonde_number'),
+    ('sounding_number', 'sounding_number'),
+    ('reason_termination', 'reason_termination'),
+    ('file_ready', 'file_ready'),
+    ('data_records', 'data_records'),
+    ('standard_levels', 'standard_levels'),
+    ('data_count', None),
+    ('hires_count', None),
+    ('header_matches', None),
+    ('error', None)
+])
+
+# Chunk of files read by a thread at a time, so that the pool overhead is not paid per file
+_CHUNK_SIZE = 256
+
+
+def guess_kind(file_arg):
+    """Return the kind of a file from its extension: ``s`` and ``z`` for ``.??S`` and ``.??Z``, ``edt`` otherwise"""
+    extension = os.path.splitext(file_arg)[1].lower()
+    return extension[-1] if extension[-1:] in ('s', 'z') else 'edt'
+
+
+def find_files(directory, pattern=FILE_NAME_REGEX):
+    """Yield the path of the files under ``directory`` which name matches the ``pattern`` regex, ignoring case"""
+    regex = re.compile(pattern, re.I)
+    for dirpath, dirnames, files in os.walk(directory):
+        dirnames.sort()
+        for name in sorted(files):
+            if regex.match(name):
+                yield os.path.join(dirpath, name)
+
+
+def _datetimes(ident):
+    try:
+        value = datetime(ident['year'], ident['month'], ident['day'], ident['hour'], ident['minute'])
+    except (TypeError, ValueError, OverflowError):
+        return None, None
+    return value, value + timedelta(seconds=ident['time_elapsed'])
+
+
+def _counts(header, kind, size):
+    """Return the data and hires record counts, and whether the header matches the file size"""
+    record_length = _HIRES_RECORDS[kind].sizeof()
+    available = max(0, size - RECORDS_OFFSET)
+    counts = _header_counts(header, kind)
+    if counts is not None and sum(counts) * record_length == available:
+        return counts + (True,)
+    return _counts_from_size(header, kind, size) + (False,)
+
+
+def scan_file(file_arg, kind=None):
+    """
+    Return the table row of a file, as a dictionary with the ``COLUMNS`` keys. ``kind`` is guessed from the file
+    name when ``None``. Errors are returned in the ``error`` value, the other values being ``None``.
+    """
+    kind = kind or guess_kind(file_arg)
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=file_arg, kind=kind)
+    try:
+        # unbuffered, as only one read is needed
+        with open(file_arg, 'rb', buffering=0) as fid:
+            size = os.fstat(fid.fileno()).st_size
+            buf = fid.read(SYSPAR_OFFSET)
+        row['size'] = size
+        if len(buf) < SYSPAR_OFFSET:
+            raise ValueError("expected %d bytes for the header and identification, found %d" %
+                             (SYSPAR_OFFSET, len(buf)))
+        header = header_layout.unpack(buf)
+        ident = identification_layout.unpack(buf, IDENTIFICATION_OFFSET)
+    except (OSError, ValueError) as e:
+        row['error'] = str(e)
+        return row
+    for column, field in COLUMNS.items():
+        if field is not None:
+            row[column] = ident[field] if field in ident else header[field]
+    row['datetime'], row['launch_time'] = _datetimes(ident)
+    row['data_count'], row['hires_count'], row['header_matches'] = _counts(header, kind, size)
+    return row
+
+
+def _scan_chunk(paths, kind):
+    return [scan_file(path, kind) for path in paths]
+
+
+class MetadataTable(object):
+    """
+    The metadata of many files, as columns: ``table['wmo_station_number']`` is the list of the station numbers of
+    every file, in scan order. See ``COLUMNS`` for the column names.
+    """
+
+    def __init__(self, rows=()):
+        self.columns = OrderedDict((name, []) for name in COLUMNS)
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        for name, column in self.columns.items():
+            column.append(row[name])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self.columns['path'])
+
+    def __repr__(self):
+        return "MetadataTable(%d files)" % len(self)
+
+    def rows(self):
+        """Yield each row, as a dictionary"""
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(names, values))
+
+    def to_csv(self, file_arg):
+        """Write the table to a CSV file, with a header line, and empty values for ``None``"""
+        with open(file_arg, 'w', newline='') as fid:
+            writer = csv.writer(fid)
+            writer.writerow(list(self.columns))
+            for values in zip(*self.columns.values()):
+                writer.writerow(['' if value is None else value for value in values])
+
+    def to_arrays(self):
+        """
+        Return the columns as NumPy arrays: ``datetime64[s]`` for dates (``NaT`` when missing), strings for text,
+        and floats for numbers, ``NaN`` for the files that could not be read. Requires NumPy.
+        """
+        import numpy as np
+        arrays = OrderedDict()
+        for name, column in self.columns.items():
+            if name in ('datetime', 'launch_time'):
+                arrays[name] = np.array(['NaT' if value is None else value for value in column],
+                                        dtype='datetime64[s]')
+            elif name in ('path', 'kind', 'radiosonde_number', 'sounding_number', 'file_ready', 'error'):
+                arrays[name] = np.array(['' if value is None else value for value in column], dtype=str)
+            elif name == 'header_matches':
+                arrays[name] = np.array([bool(value) for value in column], dtype=bool)
+            else:
+                arrays[name] = np.array([np.nan if value is None else value for value in column], dtype=float)
+        return arrays
+
+
+def scan_files(paths, workers=None, kind=None):
+    """
+    Read the metadata of ``paths`` with ``workers`` threads (by default, a few per CPU), returning a
+    ``MetadataTable`` with a row per file, in the same order. ``kind`` is the kind of every file, guessed from
+    each file name when ``None``.
+    """
+    if kind is not None:
+        _check_kind(kind)
+    paths = list(paths)
+    chunks = [paths[i:i + _CHUNK_SIZE] for i in range(0, len(paths), _CHUNK_SIZE)]
+    table = MetadataTable()
+    # threads, as reading files releases the GIL, and most of the time is spent waiting for the disk
+    with ThreadPoolExecutor(max_workers=workers or min(32, 4 * (os.cpu_count() or 1))) as executor:
+        for rows in executor.map(_scan_chunk, chunks, [kind] * len(chunks)):
+            for row in rows:
+                table.append(row)
+    return table
+
+
+def scan_directory(directory, workers=None, kind=None, pattern=FILE_NAME_REGEX):
+    """Scan the files under ``directory`` matching ``pattern`` (see ``find_files()``) with ``scan_files()``"""
+    return scan_files(find_files(directory, pattern), workers, kind)
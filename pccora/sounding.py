@@ -0,0 +1,380 @@
+"""
+Columnar (struct-of-arrays) PC-CORA sounding results.
+
+Instead of one construct Container per record, each field of the data and high resolution sections is stored as a
+single contiguous NumPy array, and all the arrays of a section share the same length.
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+from construct import Container
+
+from .pccora import MISSING_VALUE
+
+# Significance key (LEVEL TYPE FLAG) bit of the standard levels. The significance keys are stored as uint16 bit
+# masks, with the first byte of the key in the low bits.
+STANDARD_LEVEL = 0x0001
+
+
+# Channel counts of the S and Z records
+_CHANNELS = ['c%d' % i for i in range(1, 9)]
+
+
+def _significance_key_to_int(value):
+    # the construct decoders return a list of bin() strings, e.g. ['0b1', '0b0']
+    low, high = [int(bits, 2) for bits in value]
+    return low | high << 8
+
+
+def _with_missing(column, *sources):
+    # with the default missing values policy, the sources still have -32768 for missing values
+    is_missing = np.zeros(len(column), dtype=bool)
+    for source in sources:
+        is_missing |= np.asarray(source == MISSING_VALUE)
+    if is_missing.any():
+        column[is_missing] = MISSING_VALUE
+    return column
+
+
+def _spress(columns):
+    return np.exp(columns['logarithmic_pressure'] / 4096.0)
+
+
+def _computed_wind_speed(columns):
+    north, east = columns['north_wind'], columns['east_wind']
+    return _with_missing(np.hypot(north, east), north, east)
+
+
+def _computed_wind_direction(columns):
+    # meteorological convention, the direction the wind blows from, clockwise from the north
+    north, east = columns['north_wind'], columns['east_wind']
+    return _with_missing(np.degrees(np.arctan2(-east, -north)) % 360.0, north, east)
+
+
+# Columns computed from other columns of the data and hires records, only when accessed.
+RECORD_DERIVED_COLUMNS = [
+    ('spress', ('logarithmic_pressure',), _spress),
+    ('computed_wind_speed', ('north_wind', 'east_wind'), _computed_wind_speed),
+    ('computed_wind_direction', ('north_wind', 'east_wind'), _computed_wind_direction)
+]
+
+# Every column added by ``add_derived_columns()``
+DERIVED_COLUMNS = tuple(name for name, _, _ in RECORD_DERIVED_COLUMNS) + ('datetime',)
+
+# Byte alignment of each array in the compact buffer
+_ALIGNMENT = 8
+
+
+def _aligned(size):
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _copy_parts(parts, buffer):
+    for offset, array in parts:
+        if array.nbytes:
+            np.frombuffer(buffer, dtype=np.uint8, count=array.nbytes, offset=offset)[:] = \
+                array.reshape(-1).view(np.uint8)
+
+
+def _from_buffer(buffer, dtype, shape, offset):
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+    if count == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def add_derived_columns(columns, launch_time=None):
+    """
+    Add the ``RECORD_DERIVED_COLUMNS`` that can be computed from ``columns``, and if ``launch_time`` is given, a
+    ``datetime`` column with the absolute UTC time of each record (``datetime64[ms]``, ``NaT`` when the elapsed
+    time is missing or invalid).
+    """
+    for name, sources, function in RECORD_DERIVED_COLUMNS:
+        if name not in columns and all(source in columns for source in sources):
+            columns.derive(name, function)
+    if launch_time is not None and 'time' in columns and 'datetime' not in columns:
+        columns.derive('datetime', lambda c: _absolute_time(launch_time, c['time']))
+    return columns
+
+
+def _absolute_time(launch_time, elapsed_time):
+    elapsed_time = np.ma.filled(np.asarray(elapsed_time, dtype=np.float64), np.nan) \
+        if np.ma.isMaskedArray(elapsed_time) else np.asarray(elapsed_time, dtype=np.float64)
+    # the time is a float32 in the file, and corrupt values would overflow the datetime64 range
+    valid = np.isfinite(elapsed_time) & (elapsed_time != MISSING_VALUE) & \
+        (np.abs(elapsed_time) < timedelta.max.total_seconds())
+    milliseconds = np.zeros(len(elapsed_time), dtype=np.int64)
+    milliseconds[valid] = np.round(elapsed_time[valid] * 1000.0)
+    times = np.datetime64(launch_time, 'ms') + milliseconds.astype('timedelta64[ms]')
+    times[~valid] = np.datetime64('NaT')
+    return times
+
+
+class Columns(object):
+    """
+    The records of one section, stored as one contiguous array per field.
+
+    Columns are accessed by field name, e.g. ``columns["temperature"]``. Iterating over it returns the field names,
+    while ``len()`` returns the number of records.
+    """
+
+    def __init__(self, columns):
+        lengths = set(len(column) for column in columns.values())
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length, found lengths %s" % sorted(lengths))
+        self._columns = dict(columns)
+        self._names = list(columns)
+        self._loaders = {}
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def lazy(cls, length, loaders):
+        """
+        Create columns that are only materialised when accessed. ``loaders`` maps each field name to a function
+        without arguments returning the array for that field, which is called at most once.
+        """
+        columns = cls({})
+        columns._names = list(loaders)
+        columns._loaders = dict(loaders)
+        columns._length = length
+        return columns
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Create columns from a list of construct Containers, as returned by the construct engine. The channel counts
+        of S and Z records (c1 to c8) are stored as a single ``counts`` (records x 8) array, and their ``buffer``
+        as a ``uint8`` (records x 20) array.
+        """
+        if len(records) == 0:
+            return cls({})
+        columns = OrderedDict()
+        for name in records[0].keys():
+            if name in _CHANNELS:
+                if name == _CHANNELS[0]:
+                    columns['counts'] = np.array([[record[channel] for channel in _CHANNELS] for record in records],
+                                                 dtype=np.int16)
+                continue
+            values = [record[name] for record in records]
+            if name.endswith('significance_key'):
+                columns[name] = np.array([_significance_key_to_int(value) for value in values], dtype=np.uint16)
+            elif isinstance(values[0], bytes):
+                # raw bytes, like the S and Z buffer, as a (records x bytes) array, as with the numpy engine
+                columns[name] = np.frombuffer(bytearray(b''.join(values)), dtype=np.uint8).reshape(len(values), -1)
+            elif any(value is np.ma.masked for value in values):
+                # missing values returned as numpy.ma.masked, see PCCORAParser
+                mask = [value is np.ma.masked for value in values]
+                columns[name] = np.ma.masked_array([0 if is_masked else value for value, is_masked in
+                                                    zip(values, mask)], mask=mask)
+            else:
+                columns[name] = np.array(values)
+        return cls(columns)
+
+    def __getitem__(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            if name not in self._names:
+                raise
+        # another thread may materialise the same column at the same time, in which case it is computed twice
+        loader = self._loaders.get(name)
+        if loader is None:
+            if name in self._columns:
+                return self._columns[name]
+            raise ValueError("Column '%s' is no longer available, its source was closed" % name)
+        column = loader()
+        self._columns[name] = column
+        self._loaders.pop(name, None)
+        return column
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "Columns(records=%d, fields=%s)" % (self._length, self._names)
+
+    def keys(self):
+        """Return the field names"""
+        return list(self._names)
+
+    def items(self):
+        """Return (field name, array) pairs, materialising every column"""
+        return [(name, self[name]) for name in self._names]
+
+    def derive(self, name, function):
+        """
+        Add a column computed by ``function(columns)`` from the other columns, on its first access only.
+        """
+        if name not in self._names:
+            self._names.append(name)
+        self._columns.pop(name, None)
+        self._loaders[name] = lambda: function(self)
+
+    def has_flag(self, flag, key='significance_key'):
+        """
+        Return a boolean array, ``True`` for the records which significance key has any of the bits of ``flag``.
+        Use ``key='recalculated_significance_key'`` for the user edited/recalculated significance key.
+        """
+        return (self[key] & flag) != 0
+
+    def levels_with_flag(self, flag, key='significance_key'):
+        """Return the indexes of the records which significance key has any of the bits of ``flag``"""
+        return np.flatnonzero(self.has_flag(flag, key))
+
+    def is_standard_level(self, key='significance_key'):
+        """Return a boolean array, ``True`` for the standard level records"""
+        return self.has_flag(STANDARD_LEVEL, key)
+
+    def release(self):
+        """
+        Drop the loaders of the columns not yet materialised, releasing any buffer they reference. Columns
+        already materialised remain available.
+        """
+        self._loaders = {}
+
+    def _compact_layout(self, exclude, offset):
+        # the layout of the columns in the compact buffer, starting at offset, and the arrays to copy there
+        layout = []
+        parts = []
+        for name in self._names:
+            if name in exclude:
+                continue
+            column = self[name]
+            masked = np.ma.isMaskedArray(column)
+            arrays = [np.ma.getdata(column), np.ma.getmaskarray(column)] if masked else [column]
+            layout.append((name, arrays[0].dtype.str, arrays[0].shape, offset, masked))
+            for array in arrays:
+                parts.append((offset, np.ascontiguousarray(array)))
+                offset += _aligned(array.nbytes)
+        return layout, parts, offset
+
+    def to_compact(self, exclude=(), allocate=bytearray):
+        """
+        Return the columns as ``(layout, buffer)``, all the arrays copied one after the other into a single
+        buffer, and ``layout`` a list of ``(name, dtype, shape, offset, masked)`` tuples. The mask of a masked
+        array follows its data. Columns in ``exclude`` are left out.
+
+        ``allocate(size)`` returns the writable buffer, at least ``size`` bytes long (a ``bytearray`` by default).
+        """
+        layout, parts, size = self._compact_layout(exclude, 0)
+        buffer = allocate(size)
+        _copy_parts(parts, buffer)
+        return layout, buffer
+
+    @classmethod
+    def from_compact(cls, layout, buffer):
+        """
+        Create columns from the ``(layout, buffer)`` returned by ``to_compact()``. The arrays are views over
+        ``buffer``, without copying.
+        """
+        columns = OrderedDict()
+        for name, dtype, shape, offset, masked in layout:
+            column = _from_buffer(buffer, dtype, shape, offset)
+            if masked:
+                mask = _from_buffer(buffer, bool, shape, offset + _aligned(column.nbytes))
+                column = np.ma.masked_array(column, mask=mask)
+            columns[name] = column
+        return cls(columns)
+
+    def __reduce__(self):
+        return self.__class__.from_compact, self.to_compact()
+
+
+class Sounding(object):
+    """
+    A parsed PC-CORA sounding, with the data and high resolution sections stored as ``Columns``.
+
+    * ``header``, the PC-CORA file header (a construct Container)
+    * ``identification``, the PC-CORA file identification (a construct Container)
+    * ``syspar``, the PC-CORA file SYSPAR bytes
+    * ``data``, the standard level records
+    * ``hires``, the high resolution records
+
+    Both ``data`` and ``hires`` also have the derived columns (see ``add_derived_columns()``), including
+    ``datetime`` when the identification has a launch time. They are computed on first access, for the whole
+    section at once.
+
+    Soundings are pickled in their compact form (see ``to_compact()``), e.g. to send them between processes.
+    """
+
+    def __init__(self, header, identification, syspar, data, hires):
+        self.header = header
+        self.identification = identification
+        self.syspar = syspar
+        self.data = add_derived_columns(data, self.launch_time)
+        self.hires = add_derived_columns(hires, self.launch_time)
+
+    @classmethod
+    def from_result(cls, result):
+        """
+        Create a sounding from a ``PCCORAResult``, converting the records to ``Columns`` unless already columnar.
+        """
+        def to_columns(records):
+            return records if isinstance(records, Columns) else Columns.from_records(records or [])
+
+        return cls(header=result.header, identification=result.identification, syspar=result.syspar,
+                   data=to_columns(result.data), hires=to_columns(result.hires))
+
+    @property
+    def launch_time(self):
+        """The launch time, from the identification section, or ``None``"""
+        return self.identification.get('launch_time')
+
+    def __repr__(self):
+        return "Sounding(data=%d, hires=%d)" % (len(self.data), len(self.hires))
+
+    def to_compact(self, allocate=bytearray):
+        """
+        Return the sounding as ``(metadata, buffer)``: a small dictionary with the header and identification
+        values, the SYSPAR bytes and the layout of the columns, and a single buffer with the data and hires
+        arrays (see ``Columns.to_compact()``). The derived columns are left out, and computed again on access.
+        """
+        data_layout, data_parts, size = self.data._compact_layout(DERIVED_COLUMNS, 0)
+        hires_layout, hires_parts, size = self.hires._compact_layout(DERIVED_COLUMNS, size)
+        buffer = allocate(size)
+        _copy_parts(data_parts + hires_parts, buffer)
+        metadata = {
+            'header': _container_items(self.header),
+            'identification': _container_items(self.identification),
+            'syspar': self.syspar,
+            'data': data_layout,
+            'hires': hires_layout
+        }
+        return metadata, buffer
+
+    @classmethod
+    def from_compact(cls, metadata, buffer):
+        """
+        Create a sounding from the ``(metadata, buffer)`` returned by ``to_compact()``, without copying the arrays.
+        """
+        return cls(header=_container_from_items(metadata['header']),
+                   identification=_container_from_items(metadata['identification']),
+                   syspar=metadata['syspar'],
+                   data=Columns.from_compact(metadata['data'], buffer),
+                   hires=Columns.from_compact(metadata['hires'], buffer))
+
+    def __reduce__(self):
+        return self.__class__.from_compact, self.to_compact()
+
+
+def _container_items(container):
+    # construct Containers cannot be unpickled, so they are stored as (key, value) pairs, in the original order
+    return None if container is None else [(key, container[key]) for key in container.keys()]
+
+
+def _container_from_items(items):
+    if items is None:
+        return None
+    container = Container()
+    for key, value in items:
+        container[key] = value
+    return container
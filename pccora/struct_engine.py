@@ -0,0 +1,290 @@
+"""
+Decode engine for PC-CORA files using only the standard library ``struct`` module.
+
+Each section has a precompiled little-endian ``struct.Struct``, and the records are unpacked with ``iter_unpack``.
+The results are construct Containers, with the same field names and scaling as the ``ExprAdapter`` decoders in
+``pccora.pccora``, so this engine is a drop-in replacement for the construct engine when NumPy is not available.
+"""
+
+import math
+import struct
+from datetime import datetime, timedelta
+
+from construct import Container, FieldError
+
+from .pccora import RECORDS_OFFSET, MISSING_VALUE, record_counts
+
+
+def _string(obj):
+    return obj.decode('utf-8', 'ignore')
+
+
+def _scale(factor):
+    def decoder(obj):
+        return obj * factor if obj != MISSING_VALUE else obj
+
+    return decoder
+
+
+def _offset(value):
+    def decoder(obj):
+        return obj + value if obj != MISSING_VALUE else obj
+
+    return decoder
+
+
+def _truncated_scale(factor):
+    def decoder(obj):
+        return obj if obj == MISSING_VALUE else int(obj * factor)
+
+    return decoder
+
+
+def _year(obj):
+    return 1900 + obj if obj >= 20 else 2000 + obj if obj != MISSING_VALUE and obj < 1000 else obj
+
+
+def _significance_key(obj):
+    return [bin(obj[i]) for i in range(0, len(obj))]
+
+
+_FILE_READY = {1: 'READY', 0: 'NOT_READY'}
+
+
+def _file_ready(obj):
+    return _FILE_READY.get(obj, 'UNKNOWN')
+
+
+class Layout(object):
+    """
+    A fixed-size section or record: a precompiled ``struct.Struct``, and the decoders applied to its fields.
+    """
+
+    def __init__(self, fields):
+        self.names = [name for name, _, _ in fields]
+        self.struct = struct.Struct('<' + ''.join(code for _, code, _ in fields))
+        self.size = self.struct.size
+        self.decoders = [(i, decoder) for i, (_, _, decoder) in enumerate(fields) if decoder is not None]
+
+    def _decode(self, values):
+        values = list(values)
+        for i, decoder in self.decoders:
+            values[i] = decoder(values[i])
+        return _container(self.names, values)
+
+    def unpack(self, buf, offset=0):
+        """Decode one section or record from ``buf`` at ``offset`` into a construct Container"""
+        if len(buf) - offset < self.size:
+            raise FieldError("expected %d bytes, found %d" % (self.size, max(0, len(buf) - offset)))
+        return self._decode(self.struct.unpack_from(buf, offset))
+
+    def iter_unpack(self, buf):
+        """Decode every record in ``buf``, which length must be a multiple of the record size"""
+        return [self._decode(values) for values in self.struct.iter_unpack(buf)]
+
+
+def _container(names, values):
+    # faster than Container(**kw), which goes through Container.__setitem__ for each field
+    container = Container.__new__(Container)
+    dict.update(container, zip(names, values))
+    object.__setattr__(container, '__keys_order__', list(names))
+    return container
+
+
+header_layout = Layout([
+    ('copyright', '20s', _string),
+    ('identification_length', 'h', None),
+    ('syspar_length', 'h', None),
+    ('data_records', 'h', None),
+    ('standard_levels', 'h', None),
+    ('data_type', 'h', None),
+    ('data_length', 'h', None),
+    ('file_ready', 'B', _file_ready),
+    ('reserved', '17s', None)
+])
+
+identification_layout = Layout([
+    ('station_type', 'h', None),
+    ('region_number', 'h', None),
+    ('wmo_block_number', 'h', None),
+    ('wmo_station_number', 'h', None),
+    ('station_latitude', 'h', _scale(0.01)),
+    ('station_longitude', 'h', _scale(0.01)),
+    ('station_altitude', 'h', None),
+    ('wind_speed_unit', 'h', None),
+    ('telecommunications_headings', 'h', None),
+    ('reserved', 'h', None),
+    ('sounding_type', 'h', None),
+    ('start_mode', 'h', None),
+    ('time_elapsed', 'h', None),
+    ('ptu_rate', 'h', None),
+    ('spu_serial_number', 'i', None),
+    ('year', 'h', _year),
+    ('month', 'h', None),
+    ('day', 'h', None),
+    ('julian_date', 'h', None),
+    ('hour', 'h', None),
+    ('minute', 'h', None),
+    ('message_year', 'h', None),
+    ('message_month', 'h', None),
+    ('message_day', 'h', None),
+    ('message_hour', 'h', None),
+    ('cloud_group', '6s', _string),
+    ('weather_group', '6s', _string),
+    ('napp', '6s', _string),
+    ('surface_pressure', 'h', _scale(0.1)),
+    ('surface_temperature', 'h', _scale(0.1)),
+    ('surface_humidity', 'h', None),
+    ('surface_wind_direction', 'h', None),
+    ('surface_wind_speed', 'h', None),
+    ('radiosonde_number', '10s', _string),
+    ('sounding_number', '10s', _string),
+    ('pressure_correction', 'h', _scale(0.1)),
+    ('temperature_correction', 'h', _scale(0.1)),
+    ('humidity_correction', 'h', None),
+    ('success_of_signal', 'h', None),
+    ('pressure_accept_level', 'h', None),
+    ('pressure_replace_level', 'h', None),
+    ('pressure_reject_level', 'h', None),
+    ('temperature_accept_level', 'h', None),
+    ('temperature_replace_level', 'h', None),
+    ('temperature_reject_level', 'h', None),
+    ('humidity_accept_level', 'h', None),
+    ('humidity_replace_level', 'h', None),
+    ('humidity_reject_level', 'h', None),
+    ('total_omega_count', 'h', None),
+    ('reason_termination', 'h', None),
+    ('omega_count', '22s', None),
+    ('wind_computing_mode', 'h', None),
+    ('wind_mode', 'h', None),
+    ('stations_used', 'h', None),
+    ('loranc_chains_used', 'B', None),
+    ('gri_chain_1', 'h', None),
+    ('gri_chain_2', 'h', None),
+    ('exclude_loran_transmitters', 'h', None),
+    ('phase_integration_time', 'B', None),
+    ('phase_integration_time_1', 'h', None),
+    ('phase_integration_time_2', 'h', None),
+    ('phase_integration_time_3', 'h', None),
+    ('phase_integration_time_4', 'h', None),
+    ('phase_integration_time_5', 'h', None),
+    ('phase_integration_time_6', 'h', None),
+    ('phase_integration_change_level_1', 'h', None),
+    ('phase_integration_change_level_2', 'h', None),
+    ('phase_integration_change_level_3', 'h', None),
+    ('phase_integration_change_level_4', 'h', None),
+    ('phase_integration_change_level_5', 'h', None),
+    ('phase_integration_change_level_6', 'h', None),
+    ('reference_pressure', 'h', _scale(0.1)),
+    ('reference_temperature', 'h', _scale(0.1)),
+    ('reference_humidity', 'h', None)
+])
+
+syspar_layout = Layout([
+    ('syspar', '8087s', None)
+])
+
+
+def _record_fields(mixing_ratio_decoder):
+    return [
+        ('time', 'f', None),
+        ('logarithmic_pressure', 'h', None),
+        ('temperature', 'h', _scale(0.1)),
+        ('humidity', 'h', None),
+        ('north_wind', 'h', _scale(0.1)),
+        ('east_wind', 'h', _scale(0.1)),
+        ('altitude', 'h', _offset(30000.0)),
+        ('pressure', 'h', _scale(0.1)),
+        ('dew_point_temperature', 'h', _scale(0.1)),
+        ('mixing_ratio', 'h', mixing_ratio_decoder),
+        ('wind_direction', 'h', None),
+        ('wind_speed', 'h', _truncated_scale(0.01)),
+        ('azimuth', 'h', None),
+        ('horizontal_distance', 'h', None),
+        ('longitude', 'h', _scale(0.1)),
+        ('latitude', 'h', _scale(0.1)),
+        ('significance_key', '2s', _significance_key),
+        ('recalculated_significance_key', '2s', _significance_key),
+        ('radar_height', 'h', None)
+    ]
+
+
+class RecordLayout(Layout):
+    """
+    The data and hires records, which also have the ``spress`` value computed from ``logarithmic_pressure``.
+    """
+
+    def _decode(self, values):
+        record = Layout._decode(self, values)
+        record['spress'] = math.exp(record['logarithmic_pressure'] / 4096.0)
+        return record
+
+
+data_layout = RecordLayout(_record_fields(None))
+
+hires_layout = RecordLayout(_record_fields(_scale(0.1)))
+
+# Same layout for the S and Z files
+s_hires_layout = z_hires_layout = Layout([
+    ('time', 'h', None),
+    ('logarithmic_pressure', 'h', None),
+    ('temperature', 'h', _scale(0.1)),
+    ('humidity', 'h', None),
+    ('n_data', 'h', None),
+    ('c1', 'h', None),
+    ('c2', 'h', None),
+    ('c3', 'h', None),
+    ('c4', 'h', None),
+    ('c5', 'h', None),
+    ('c6', 'h', None),
+    ('c7', 'h', None),
+    ('c8', 'h', None),
+    ('cycles', 'h', None),
+    ('not_used', 'h', None),
+    ('buffer', '20s', None)
+])
+
+
+def unpack_identification(buf, offset=0):
+    """
+    Decode the identification section, adding the ``datetime`` and ``launch_time`` values like
+    ``pccora_identification``.
+    """
+    ident = identification_layout.unpack(buf, offset)
+    ident['datetime'] = None if ident['year'] == 0 or ident['month'] == 0 or ident['day'] == 0 else datetime(
+        ident['year'], ident['month'], ident['day'], ident['hour'], ident['minute'])
+    ident['launch_time'] = None if ident['datetime'] is None else ident['datetime'] + timedelta(
+        seconds=ident['time_elapsed'])
+    return ident
+
+
+def _unpack_records(layout, buf, offset, count):
+    return layout.iter_unpack(buf[offset:offset + count * layout.size])
+
+
+def parse_buffer(buf, kind='edt', counts=None):
+    """
+    Parse a PC-CORA (EDT), S or Z file already loaded in memory, returning the same construct Container as
+    ``pccora_file``, ``pccora_s_file`` or ``pccora_z_file``. ``counts`` is the number of data and hires records,
+    by default given by ``record_counts()``.
+    """
+    buf = memoryview(buf)
+    header = header_layout.unpack(buf, 0)
+    identification = unpack_identification(buf, header_layout.size)
+    syspar = syspar_layout.unpack(buf, header_layout.size + identification_layout.size)
+    offset = RECORDS_OFFSET
+
+    result = Container(
+        pccora_header=header,
+        pccora_identification=identification,
+        pccora_syspar=syspar
+    )
+    data_count, hires_count = record_counts(header, kind, len(buf)) if counts is None else counts
+    if kind == 'edt':
+        result['pccora_data'] = _unpack_records(data_layout, buf, offset, data_count)
+        offset += data_count * data_layout.size
+        hires = hires_layout
+    else:
+        hires = s_hires_layout if kind == 's' else z_hires_layout
+    result['pccora_hires_data'] = _unpack_records(hires, buf, offset, hires_count)
+    return result
@@ -0,0 +1,306 @@
+"""
+Deterministic synthetic PC-CORA files, for tests and benchmarks.
+
+``generate_sounding()`` simulates a radiosonde ascending at a constant rate through the International Standard
+Atmosphere up to the balloon burst, then descending back to the ground, with some winds and noise, and returns a
+``Sounding`` with plausible values for every field, however long the sounding. The same
+arguments (including ``seed``) always give the same sounding. ``generate_bytes()`` and ``generate_file()`` encode
+it with ``pccora.writer``, optionally with missing values and corruptions, and ``generate_archive()`` writes a
+tree of files like a station archive. Requires NumPy.
+"""
+
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from construct import Container
+
+from .pccora import MISSING_VALUE, MAX_DATA_RECORDS, RECORDS_OFFSET, KINDS, IDENTIFICATION_OFFSET, SYSPAR_OFFSET, \
+    _check_kind
+from .numpy_engine import HIRES_LAYOUTS
+from .sounding import Columns, Sounding, STANDARD_LEVEL
+from .struct_engine import header_layout, identification_layout, syspar_layout
+from .writer import write_bytes, _pack_section
+
+# Default number of high resolution records, and seconds between them, of each kind of file
+DEFAULT_RECORDS = {
+    'edt': 3000,
+    's': 6000,
+    'z': 3000
+}
+DEFAULT_INTERVAL = {
+    'edt': 2.0,
+    's': 1.0,
+    'z': 2.0
+}
+
+# Pressures of the standard levels, in hPa, see ``STANDARD_LEVEL``
+STANDARD_PRESSURES = (1000, 925, 850, 700, 500, 400, 300, 250, 200, 150, 100, 70, 50, 30, 20, 10, 7, 5, 3, 2, 1)
+
+# Corruptions applied by ``generate_bytes()``
+CORRUPTIONS = ('truncate', 'garbage', 'header')
+
+# Columns where ``generate_sounding()`` injects missing values, for each kind of file
+_MISSING_COLUMNS = {
+    'edt': ('temperature', 'humidity', 'north_wind', 'east_wind', 'pressure', 'dew_point_temperature'),
+    's': ('temperature', 'humidity'),
+    'z': ('temperature', 'humidity')
+}
+
+# Metres per second, and altitude of the balloon burst in metres
+_ASCENT_RATE = 5.0
+_DESCENT_RATE = 15.0
+_BURST_ALTITUDE = 32000.0
+_STATION = {
+    'wmo_block_number': 93,
+    'wmo_station_number': 844,
+    'station_latitude': -46.42,
+    'station_longitude': 168.32,
+    'station_altitude': 2
+}
+
+
+def _atmosphere(altitude):
+    """Temperature (Celsius) and pressure (hPa) of the International Standard Atmosphere at ``altitude`` metres"""
+    temperature = np.where(altitude < 11000, 15.0 - 0.0065 * altitude,
+                           np.where(altitude < 20000, -56.5, -56.5 + 0.001 * (altitude - 20000)))
+    # the power term is only valid, and computed, in the troposphere: it is NaN above about 44 km
+    pressure = np.where(altitude < 11000, 1013.25 * (1 - 2.25577e-5 * np.minimum(altitude, 11000)) ** 5.25588,
+                        226.32 * np.exp(-(altitude - 11000) / 6341.6))
+    return temperature, pressure
+
+
+def _profile(count, interval, station_altitude, random):
+    """
+    Simulate ``count`` records, ascending up to ``_BURST_ALTITUDE`` then descending and staying on the ground,
+    returning a dictionary of decoded values for the EDT record fields
+    """
+    time = np.arange(count) * interval
+    burst_time = (_BURST_ALTITUDE - station_altitude) / _ASCENT_RATE
+    altitude = np.where(time < burst_time, station_altitude + _ASCENT_RATE * time,
+                        np.maximum(_BURST_ALTITUDE - _DESCENT_RATE * (time - burst_time), station_altitude))
+    altitude = altitude + random.normal(0, 2, count).cumsum() * 0.1
+    temperature, pressure = _atmosphere(altitude)
+    temperature = temperature + random.normal(0, 0.2, count)
+    humidity = np.clip(85.0 * np.exp(-altitude / 6000.0) + random.normal(0, 1.0, count), 1, 100)
+    north_wind = 10.0 * np.sin(altitude / 7000.0) + random.normal(0, 0.5, count)
+    east_wind = 5.0 + 20.0 * np.exp(-((altitude - 11000) / 4000.0) ** 2) + random.normal(0, 0.5, count)
+    north = np.cumsum(north_wind) * interval
+    east = np.cumsum(east_wind) * interval
+    # Magnus formula
+    vapour_pressure = humidity / 100.0 * 6.112 * np.exp(17.62 * temperature / (243.12 + temperature))
+    dew_point = 243.12 * np.log(vapour_pressure / 6.112) / (17.62 - np.log(vapour_pressure / 6.112))
+    return OrderedDict([
+        ('time', time.astype(np.float32)),
+        ('logarithmic_pressure', np.round(4096.0 * np.log(pressure))),
+        ('temperature', np.round(temperature, 1)),
+        ('humidity', np.round(humidity)),
+        ('north_wind', np.round(north_wind, 1)),
+        ('east_wind', np.round(east_wind, 1)),
+        ('altitude', np.round(altitude)),
+        ('pressure', np.round(pressure, 1)),
+        ('dew_point_temperature', np.round(dew_point, 1)),
+        ('mixing_ratio', np.round(622.0 * vapour_pressure / (pressure - vapour_pressure), 1)),
+        ('wind_direction', np.round(np.degrees(np.arctan2(-east_wind, -north_wind)) % 360)),
+        ('wind_speed', np.round(np.hypot(north_wind, east_wind)).astype(np.int64)),
+        ('azimuth', np.round(np.degrees(np.arctan2(east, north)) % 360)),
+        ('horizontal_distance', np.round(np.hypot(north, east) / 100.0)),
+        ('longitude', np.round(east / 1000.0, 1)),
+        ('latitude', np.round(north / 1000.0, 1)),
+        ('significance_key', np.zeros(count, dtype=np.uint16)),
+        ('recalculated_significance_key', np.zeros(count, dtype=np.uint16)),
+        ('radar_height', np.zeros(count))
+    ])
+
+
+def _standard_levels(values, count):
+    """
+    The data records: the first ``count`` standard levels reached by the ``values`` records, or the surface record
+    when the sounding does not reach any, as PC-CORA (EDT) files have at least one data record
+    """
+    pressure = values['pressure']
+    indexes = []
+    for standard_pressure in STANDARD_PRESSURES[:count]:
+        below = np.nonzero(pressure <= standard_pressure)[0]
+        if len(below):
+            indexes.append(below[0])
+    data = OrderedDict((name, column[indexes or [0]].copy()) for name, column in values.items())
+    if indexes:
+        data['significance_key'][:] = STANDARD_LEVEL
+    return data
+
+
+def _s_records(values, random):
+    count = len(values['time'])
+    return OrderedDict([
+        ('time', np.round(values['time'])),
+        ('logarithmic_pressure', values['logarithmic_pressure']),
+        ('temperature', values['temperature']),
+        ('humidity', values['humidity']),
+        ('n_data', np.full(count, 8)),
+        ('counts', random.randint(0, 30000, size=(count, 8))),
+        ('cycles', np.arange(count) % 1000),
+        ('not_used', np.zeros(count)),
+        ('buffer', np.zeros((count, 20), dtype=np.uint8))
+    ])
+
+
+def _inject_missing(columns, names, fraction, random):
+    for name in names:
+        column = columns[name].astype(np.float64)
+        column[random.random_sample(len(column)) < fraction] = MISSING_VALUE
+        columns[name] = column
+
+
+def _syspar(random):
+    """Random SYSPAR bytes"""
+    return random.randint(0, 256, size=syspar_layout.size).astype(np.uint8).tobytes()
+
+
+def _sections(kind, launch_time, sequence):
+    """The header and identification Containers of a sounding"""
+    header = OrderedDict.fromkeys(header_layout.names, 0)
+    header.update(copyright='Vaisala DigiCORA MW11', identification_length=identification_layout.size,
+                  syspar_length=syspar_layout.size, data_type=1, file_ready='READY', reserved=b'')
+
+    synoptic_time = launch_time.replace(minute=0, second=0)
+    identification = OrderedDict.fromkeys(identification_layout.names, 0)
+    identification.update(_STATION)
+    identification.update(
+        year=synoptic_time.year, month=synoptic_time.month, day=synoptic_time.day, hour=synoptic_time.hour,
+        minute=synoptic_time.minute, julian_date=synoptic_time.timetuple().tm_yday,
+        message_year=synoptic_time.year % 100, message_month=synoptic_time.month,
+        message_day=synoptic_time.day, message_hour=synoptic_time.hour,
+        time_elapsed=int((launch_time - synoptic_time).total_seconds()),
+        ptu_rate=1, spu_serial_number=100000 + sequence,
+        cloud_group='', weather_group='', napp='', omega_count=b'',
+        radiosonde_number='%10d' % (400000000 + sequence), sounding_number='%10d' % sequence,
+        surface_pressure=1013.2, surface_temperature=15.0, surface_humidity=85,
+        reason_termination=1 if kind == 'edt' else 0,
+        datetime=synoptic_time, launch_time=launch_time
+    )
+    return Container(**header), Container(**identification)
+
+
+def generate_sounding(kind='edt', records=None, standard_levels=MAX_DATA_RECORDS, interval=None,
+                      launch_time=datetime(1995, 1, 1, 11, 15), missing_fraction=0.0, seed=0):
+    """
+    Return a synthetic ``Sounding`` of a PC-CORA (EDT), S or Z (``kind``) file.
+
+    * ``records``, the number of high resolution records (see ``DEFAULT_RECORDS``), over at most about nine hours
+      for S and Z files
+    * ``standard_levels``, the number of data records of PC-CORA (EDT) files, 1 to ``MAX_DATA_RECORDS``, fewer
+      when the sounding does not reach as many ``STANDARD_PRESSURES`` (but at least the surface record)
+    * ``interval``, seconds between two records (see ``DEFAULT_INTERVAL``)
+    * ``launch_time``, the launch time, the identification date being the synoptic hour before it
+    * ``missing_fraction``, the probability of each measured value to be missing (``MISSING_VALUE``)
+    * ``seed``, the seed of the random noise
+    """
+    _check_kind(kind)
+    if not 1 <= standard_levels <= MAX_DATA_RECORDS:
+        raise ValueError("Invalid standard_levels %d, must be between 1 and %d" % (standard_levels, MAX_DATA_RECORDS))
+    records = DEFAULT_RECORDS[kind] if records is None else records
+    interval = DEFAULT_INTERVAL[kind] if interval is None else interval
+    if kind != 'edt' and records * interval > np.iinfo(np.int16).max:
+        raise ValueError("S and Z files times are 16 bits integers, at most %d seconds" % np.iinfo(np.int16).max)
+    random = np.random.RandomState(seed)
+    header, identification = _sections(kind, launch_time, seed)
+    syspar = _syspar(random)
+
+    values = _profile(records, interval, _STATION['station_altitude'], random)
+    if kind == 'edt':
+        data = _standard_levels(values, standard_levels)
+        hires = values
+    else:
+        data = OrderedDict()
+        hires = _s_records(values, random)
+    if missing_fraction:
+        _inject_missing(hires, _MISSING_COLUMNS[kind], missing_fraction, random)
+    return Sounding(header, identification, syspar, Columns(data), Columns(hires))
+
+
+def corrupt_bytes(buf, corruption, kind='edt', seed=0):
+    """
+    Corrupt, in place, the bytes ``buf`` of a file, with one of the ``CORRUPTIONS``:
+
+    * ``truncate``, cutting the file in the middle of a record
+    * ``garbage``, overwriting a record in the second half of the file with random bytes
+    * ``header``, setting the header record counts to values that do not match the file
+
+    Returns ``buf``, which must be a ``bytearray``.
+    """
+    if corruption not in CORRUPTIONS:
+        raise ValueError("Invalid corruption '%s', must be one of %s" % (corruption, ', '.join(CORRUPTIONS)))
+    random = np.random.RandomState(seed)
+    record_length = HIRES_LAYOUTS[kind][0].itemsize
+    count = (len(buf) - RECORDS_OFFSET) // record_length
+    if corruption == 'truncate':
+        del buf[RECORDS_OFFSET + count * record_length // 2 + record_length // 2:]
+    elif corruption == 'garbage':
+        offset = RECORDS_OFFSET + (count // 2 + random.randint(0, max(1, count // 2))) * record_length
+        buf[offset:offset + record_length] = random.randint(0, 256, size=record_length).astype(np.uint8).tobytes()
+    else:
+        # data_records and standard_levels
+        buf[24:28] = np.array([count * 2, MAX_DATA_RECORDS * 2], dtype='<i2').tobytes()
+    return buf
+
+
+def generate_bytes(kind='edt', corruption=None, **kwargs):
+    """
+    Return the bytes (a ``bytearray``) of a synthetic file, see ``generate_sounding()`` for the arguments, and
+    ``corrupt_bytes()`` for the ``corruption``.
+    """
+    buf = write_bytes(generate_sounding(kind, **kwargs), kind, recount=True)
+    if corruption is not None:
+        corrupt_bytes(buf, corruption, kind, kwargs.get('seed', 0))
+    return buf
+
+
+def generate_file(file_arg, kind='edt', corruption=None, **kwargs):
+    """Write a synthetic file, see ``generate_bytes()``"""
+    with open(file_arg, 'wb') as fid:
+        fid.write(generate_bytes(kind, corruption, **kwargs))
+
+
+def file_name(launch_time, kind):
+    """
+    The archive name of a file, the synoptic date and hour, and the launch minute, followed by the kind, like
+    ``93011809.21S``
+    """
+    return '%s.%02d%s' % (launch_time.strftime('%y%m%d%H'), launch_time.minute, 'E' if kind == 'edt' else kind.upper())
+
+
+def generate_archive(directory, soundings=100, kinds=KINDS, start=datetime(1995, 1, 1, 11, 15),
+                     every=timedelta(hours=12), records=None, missing_fraction=0.0, corrupt_fraction=0.0, seed=0):
+    """
+    Write ``soundings`` synthetic soundings under ``directory``, one every ``every`` from ``start``, each as one
+    file of every kind in ``kinds``, in ``YYYY/MM`` sub-directories. ``records`` and ``missing_fraction`` are
+    passed to ``generate_sounding()``, and each file has a ``corrupt_fraction`` probability to be corrupted by one
+    of the ``CORRUPTIONS``. Returns the list of file paths written.
+
+    The profiles are generated once per kind, and only the identification and the SYSPAR bytes (random noise, drawn
+    again for each file) change between soundings, so that large archives are written quickly.
+    """
+    random = np.random.RandomState(seed)
+    templates = dict((kind, generate_sounding(kind, records=records, missing_fraction=missing_fraction, seed=seed))
+                     for kind in kinds)
+    encoded = dict((kind, write_bytes(templates[kind], kind, recount=True)) for kind in kinds)
+    paths = []
+    for sequence in range(soundings):
+        launch_time = start + sequence * every
+        month_directory = os.path.join(directory, '%04d' % launch_time.year, '%02d' % launch_time.month)
+        if not os.path.isdir(month_directory):
+            os.makedirs(month_directory)
+        for kind in kinds:
+            buf = bytearray(encoded[kind])
+            _, identification = _sections(kind, launch_time, sequence)
+            _pack_section(identification_layout, identification, buf, IDENTIFICATION_OFFSET)
+            buf[SYSPAR_OFFSET:RECORDS_OFFSET] = _syspar(random)
+            if random.random_sample() < corrupt_fraction:
+                corrupt_bytes(buf, CORRUPTIONS[random.randint(0, len(CORRUPTIONS))], kind, seed + sequence)
+            path = os.path.join(month_directory, file_name(launch_time, kind))
+            with open(path, 'wb') as fid:
+                fid.write(buf)
+            paths.append(path)
+    return paths
@@ -0,0 +1,102 @@
+import os
+import unittest
+
+from pccora import PCCORAParser
+from pccora.batch import parse_many, iter_parse_many
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def list_shared_memory():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+
+    def test_parse_many(self):
+        missing_file_name = os.path.join(os.path.dirname(__file__), "missing.EDT")
+        results = parse_many([self.s_file_name, missing_file_name, self.z_file_name], workers=2)
+        self.assertEqual([self.s_file_name, missing_file_name, self.z_file_name], [r.path for r in results])
+        self.assertEqual([True, False, True], [r.ok for r in results])
+        self.assertTrue(isinstance(results[1].error, IOError))
+
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        expected = parser.get_sounding()
+        sounding = results[0].sounding
+        self.assertEqual(expected.identification, sounding.identification)
+        self.assertEqual(list(expected.hires), list(sounding.hires))
+        for name in expected.hires:
+            np.testing.assert_array_equal(expected.hires[name], sounding.hires[name])
+
+    def test_iter_parse_many_kind(self):
+        results = list(iter_parse_many([self.z_file_name], workers=1, kind='z'))
+        self.assertEqual(1, len(results))
+        self.assertEqual(2696, len(results[0].sounding.hires))
+        self.assertEqual((2696, 8), results[0].sounding.hires['counts'].shape)
+
+    def test_invalid_kind(self):
+        with self.assertRaises(ValueError):
+            parse_many([self.s_file_name], kind='edt2')
+
+    @unittest.skipIf(shared_memory is None, "multiprocessing.shared_memory requires Python 3.8")
+    def test_shared_memory_transport(self):
+        before = list_shared_memory()
+        expected = parse_many([self.z_file_name], workers=1, kind='z')
+        results = parse_many([self.z_file_name], workers=1, kind='z', transport='shared_memory')
+        self.assertEqual(before, list_shared_memory())
+        for expected_result, result in zip(expected, results):
+            self.assertTrue(result.ok)
+            self.assertEqual(expected_result.sounding.identification, result.sounding.identification)
+            for name in expected_result.sounding.hires:
+                np.testing.assert_array_equal(expected_result.sounding.hires[name], result.sounding.hires[name])
+
+    @unittest.skipIf(shared_memory is None, "multiprocessing.shared_memory requires Python 3.8")
+    def test_shared_memory_stop_iterating(self):
+        before = list_shared_memory()
+        results = iter_parse_many([self.s_file_name] * 4, workers=2, transport='shared_memory')
+        sounding = next(results).sounding
+        results.close()
+        self.assertEqual(before, list_shared_memory())
+        self.assertEqual(7126, len(sounding.hires['temperature']))
+
+    def test_repeated_paths(self):
+        results = parse_many([self.z_file_name, self.s_file_name, self.z_file_name], workers=2, kind='z')
+        self.assertEqual([self.z_file_name, self.s_file_name, self.z_file_name], [result.path for result in results])
+        self.assertEqual([2696, 5721, 2696], [len(result.sounding.hires) for result in results])
+        self.assertIsNot(results[0], results[2])
+
+    def test_bounded_submissions(self):
+        consumed = []
+
+        def paths():
+            for i in range(20):
+                consumed.append(i)
+                yield self.z_file_name
+
+        results = iter_parse_many(paths(), workers=1, kind='z')
+        self.assertTrue(next(results).ok)
+        # two files in flight per worker, one more submitted when the first one completed
+        self.assertEqual(3, len(consumed))
+        self.assertEqual(19, len(list(results)))
+        self.assertEqual(20, len(consumed))
+
+    def test_recover(self):
+        results = parse_many([self.s_file_name, self.z_file_name], workers=2, kind='s', recover=True)
+        self.assertEqual([], results[0].problems)
+        self.assertEqual(5721, len(results[0].sounding.hires))
+        self.assertEqual(2, len(results[1].sounding.hires))
+        self.assertTrue(len(results[1].problems) > 0)
@@ -0,0 +1,52 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import warnings
+
+from pccora import parse_bytes
+from pccora.pccora import HeaderMismatchWarning
+
+BENCHMARKS_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'benchmarks')
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        sys.path.insert(0, BENCHMARKS_DIRECTORY)
+        self.addCleanup(sys.path.remove, BENCHMARKS_DIRECTORY)
+        self.run_benchmarks = importlib.import_module('run_benchmarks')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_sizes(self):
+        # every synthetic file of the benchmark can be generated, and parsed without warnings
+        for size, records in self.run_benchmarks.SIZES.items():
+            for kind, count in records.items():
+                file_name = os.path.join(self.directory, '%s.%s' % (size, kind))
+                self.run_benchmarks.generate_file(file_name, kind, records=count)
+                with open(file_name, 'rb') as fid:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('error', HeaderMismatchWarning)
+                        result = parse_bytes(fid.read(), kind, engine='numpy')
+                self.assertEqual(count, len(result.hires), (size, kind))
+
+    def test_compare(self):
+        baseline = [{'name': 'parse_file[numpy]', 'size': 'small', 'records_per_second': 1000.0}]
+        compare = self.run_benchmarks.compare
+        self.assertEqual([], compare([dict(baseline[0], records_per_second=900.0)], baseline, 0.2))
+        self.assertEqual([('parse_file[numpy]', 'small', 0.5)],
+                         compare([dict(baseline[0], records_per_second=500.0)], baseline, 0.2))
+        self.assertEqual([], compare([dict(baseline[0], size='large')], baseline, 0.2))
+
+
+if __name__ == '__main__':
+    unittest.main()
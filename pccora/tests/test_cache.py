@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import warnings
+
+from pccora.cache import ParseCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.s_file_name = os.path.join(self.directory, "93011809.21S")
+        shutil.copy(os.path.join(os.path.dirname(__file__), "93011809.21S"), self.s_file_name)
+        self.cache_directory = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit(self):
+        cache = ParseCache(self.cache_directory)
+        sounding = cache.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assertTrue(sounding is cache.parse_file(self.s_file_name, kind='s'))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # a new cache reads the entry written on disk
+        other = ParseCache(self.cache_directory)
+        cached = other.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((1, 0), (other.hits, other.misses))
+        self.assertEqual(sounding.header, cached.header)
+        self.assertEqual(sounding.identification, cached.identification)
+        self.assertEqual(sounding.syspar, cached.syspar)
+        for name in cached.hires.keys():
+            np.testing.assert_array_equal(sounding.hires[name], cached.hires[name])
+
+        # entries are keyed by kind and missing values policy too
+        masked = other.parse_file(self.s_file_name, kind='s', missing='mask')
+        self.assertEqual((1, 1), (other.hits, other.misses))
+        self.assertTrue(isinstance(masked.hires['temperature'], np.ma.MaskedArray))
+
+    def test_stale(self):
+        cache = ParseCache(self.cache_directory, memory_items=0)
+        sounding = cache.parse_file(self.s_file_name, kind='s')
+        with open(self.s_file_name, 'r+b') as fid:
+            fid.truncate(os.path.getsize(self.s_file_name) - 50)
+        modified = time.time() + 10
+        os.utime(self.s_file_name, (modified, modified))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            changed = cache.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        self.assertEqual(len(sounding.hires) - 1, len(changed.hires))
+
+    def test_hash(self):
+        cache = ParseCache(self.cache_directory, memory_items=0, verify='hash')
+        cache.parse_file(self.s_file_name, kind='s')
+        stat = os.stat(self.s_file_name)
+        # same size and modification time, different content
+        with open(self.s_file_name, 'r+b') as fid:
+            fid.seek(-1, os.SEEK_END)
+            fid.write(b'\xff')
+        os.utime(self.s_file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        cache.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        cache.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_eviction(self):
+        z_file_name = os.path.join(self.directory, "93011809.21Z")
+        shutil.copy(os.path.join(os.path.dirname(__file__), "93011809.21Z"), z_file_name)
+        cache = ParseCache(self.cache_directory, memory_items=0)
+        cache.parse_file(self.s_file_name, kind='s')
+        entry_size = cache.size
+
+        cache = ParseCache(self.cache_directory, max_size=entry_size + 1, memory_items=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            cache.parse_file(z_file_name, kind='z')
+        # the least recently used entry was removed
+        self.assertTrue(cache.size <= entry_size + 1)
+        cache.parse_file(z_file_name, kind='z')
+        cache.parse_file(self.s_file_name, kind='s')
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+        cache.clear()
+        self.assertEqual(0, cache.size)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ParseCache(self.cache_directory, verify='size')
+        cache = ParseCache(self.cache_directory)
+        with self.assertRaises(ValueError):
+            cache.parse_file(self.s_file_name, kind='x')
+        with self.assertRaises(ValueError):
+            cache.parse_file(self.s_file_name, missing='zero')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from pccora.catalog import Catalog, UpdateSummary, COLUMNS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        tests_directory = os.path.dirname(__file__)
+        self.archive = os.path.join(self.directory, "archive")
+        os.makedirs(self.archive)
+        self.s_file_name = os.path.join(self.archive, "93011809.21S")
+        self.z_file_name = os.path.join(self.archive, "93011809.21Z")
+        shutil.copy(os.path.join(tests_directory, "93011809.21S"), self.s_file_name)
+        shutil.copy(os.path.join(tests_directory, "93011809.21Z"), self.z_file_name)
+        self.database = os.path.join(self.directory, "catalog.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_update_directory(self):
+        with Catalog(self.database) as catalog:
+            self.assertEqual(UpdateSummary(2, 0, 0), catalog.update_directory(self.archive))
+            self.assertEqual(2, len(catalog))
+
+        # reopened, only the changed files are read again
+        with Catalog(self.database) as catalog:
+            self.assertEqual(UpdateSummary(0, 2, 0), catalog.update_directory(self.archive))
+            modified = time.time() + 10
+            os.utime(self.s_file_name, (modified, modified))
+            self.assertEqual(UpdateSummary(1, 1, 0), catalog.update_directory(self.archive))
+            os.remove(self.z_file_name)
+            self.assertEqual(UpdateSummary(0, 1, 1), catalog.update_directory(self.archive))
+            self.assertEqual([os.path.abspath(self.s_file_name)], [row['path'] for row in catalog.query()])
+
+    def test_row(self):
+        with Catalog(':memory:') as catalog:
+            catalog.update([self.s_file_name])
+            row, = catalog.query()
+        self.assertEqual([name for name, _ in COLUMNS], list(row))
+        self.assertEqual('s', row['kind'])
+        self.assertEqual((2, 313), (row['wmo_block_number'], row['wmo_station_number']))
+        self.assertEqual(datetime(1993, 1, 18, 10, 24, 54), row['launch_time'])
+        self.assertEqual((0, 5721, True), (row['data_count'], row['hires_count'], row['header_matches']))
+        self.assertEqual(9653.0, row['duration'])
+        self.assertAlmostEqual(5.83, row['min_pressure'], places=2)
+        # no altitudes in S files
+        self.assertIsNone(row['max_altitude'])
+        self.assertIsNone(row['error'])
+
+    def test_errors(self):
+        missing_file_name = os.path.join(self.archive, "missing.EDT")
+        with Catalog(':memory:') as catalog:
+            self.assertEqual(UpdateSummary(1, 0, 0), catalog.update([missing_file_name]))
+            row, = catalog.query()
+            self.assertIsNotNone(row['error'])
+            self.assertIsNone(row['launch_time'])
+            # files which cannot be read are always read again
+            self.assertEqual(UpdateSummary(1, 0, 0), catalog.update([missing_file_name]))
+            with self.assertRaises(ValueError):
+                catalog.update([self.s_file_name], kind='x')
+
+    def test_query(self):
+        with Catalog(':memory:') as catalog:
+            catalog.update_directory(self.archive, workers=2)
+            self.assertEqual(2, len(catalog.query(wmo_block_number=2, wmo_station_number=313)))
+            self.assertEqual(0, len(catalog.query(wmo_station_number=93844)))
+            self.assertEqual(2, len(catalog.query(start=datetime(1993, 1, 1), end=datetime(1994, 1, 1))))
+            self.assertEqual(0, len(catalog.query(start=datetime(1993, 1, 18, 10, 25))))
+            self.assertEqual(0, len(catalog.query(end=datetime(1993, 1, 18, 10, 24, 54))))
+            self.assertEqual(2, len(catalog.query(bbox=(60, 24, 61, 25))))
+            self.assertEqual(0, len(catalog.query(bbox=(-50, 160, -40, 180))))
+            self.assertEqual(['s'], [row['kind'] for row in catalog.query(kind='s', max_pressure=10)])
+            self.assertEqual(0, len(catalog.query(min_altitude=25000)))
+
+
+class TestCatalogWithoutNumpy(unittest.TestCase):
+
+    def test_update(self):
+        s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            with Catalog(':memory:') as catalog:
+                self.assertEqual(UpdateSummary(1, 0, 0), catalog.update([s_file_name]))
+                row, = catalog.query()
+        # indexed, without the summary statistics
+        self.assertIsNone(row['error'])
+        self.assertEqual((2, 313), (row['wmo_block_number'], row['wmo_station_number']))
+        self.assertEqual((None, None, None), (row['duration'], row['min_pressure'], row['max_altitude']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import warnings
+
+from pccora import PCCORAParser
+from pccora.pccora import HeaderMismatchWarning
+
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'scripts')
+
+try:
+    import numpy as np
+    from pccora.numpy_engine import data_dtype
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestConvert2csv(unittest.TestCase):
+
+    def setUp(self):
+        sys.path.insert(0, SCRIPTS_DIRECTORY)
+        self.addCleanup(sys.path.remove, SCRIPTS_DIRECTORY)
+        from convert2csv import convert2csv
+        self.convert2csv = convert2csv
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+
+    def test_csv_header(self):
+        parser = PCCORAParser(engine='numpy')
+        with warnings.catch_warnings():
+            # the S file is parsed as a PC-CORA (EDT) file, like in the other tests
+            warnings.simplefilter('ignore', HeaderMismatchWarning)
+            parser.parse_file(self.s_file_name)
+        sounding = parser.get_sounding()
+        csv_file_name = os.path.join(self.directory, 'hires.csv')
+        self.convert2csv(data=dict(head=sounding.header, ident=sounding.identification, data=sounding.data,
+                                   hires_data=sounding.hires),
+                         options=dict(include_header=False, include_ident=False, include_data=False,
+                                      include_hires=True),
+                         file=csv_file_name)
+        with open(csv_file_name) as fid:
+            lines = fid.read().splitlines()
+        # the record fields and spress, like the construct records
+        self.assertEqual(list(data_dtype.names) + ['spress'], lines[0].split('|'))
+        self.assertEqual(len(sounding.hires) + 1, len(lines))
+        # the other derived columns were not computed
+        self.assertFalse('computed_wind_speed' in sounding.hires._columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
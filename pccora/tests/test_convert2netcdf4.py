@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+import warnings
+
+from pccora import PCCORAParser
+from pccora.pccora import HeaderMismatchWarning
+
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'scripts')
+
+try:
+    import numpy as np
+    import netCDF4
+except ImportError:
+    np = netCDF4 = None
+
+
+@unittest.skipIf(netCDF4 is None, "NumPy or netCDF4 is not installed")
+class TestConvert2netcdf4(unittest.TestCase):
+
+    def setUp(self):
+        sys.path.insert(0, SCRIPTS_DIRECTORY)
+        self.addCleanup(sys.path.remove, SCRIPTS_DIRECTORY)
+        from convert2netcdf4 import significance_key_digits
+        self.significance_key_digits = significance_key_digits
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+
+    def test_significance_key_digits(self):
+        # the same values as the construct records, written by the earlier versions of the script
+        parsers = [PCCORAParser(), PCCORAParser(engine='numpy')]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', HeaderMismatchWarning)
+            for parser in parsers:
+                parser.parse_file(self.s_file_name)
+        hires = parsers[1].get_sounding().hires
+        for key in ('significance_key', 'recalculated_significance_key'):
+            expected = [''.join(record[key]).replace('0b', '') for record in parsers[0].get_hires_data()]
+            self.assertEqual(expected, self.significance_key_digits(hires[key]))
+
+
+if __name__ == '__main__':
+    unittest.main()
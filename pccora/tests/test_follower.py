@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from pccora import HiresFollower, parse_edt, parse_s
+from pccora.pccora import RECORDS_OFFSET, HeaderMismatchWarning
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestFollower(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        with open(self.s_file_name, 'rb') as fid:
+            self.data = fid.read()
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, "93011809.EDT")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data, file_ready=0):
+        data = bytearray(data)
+        data[32] = file_ready
+        with open(self.file_name, 'wb') as fid:
+            fid.write(data)
+
+    def test_poll(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', HeaderMismatchWarning)
+            expected = parse_edt(self.s_file_name, engine='struct')
+
+        self.write(self.data[:RECORDS_OFFSET - 100])
+        with HiresFollower(self.file_name, engine='struct') as follower:
+            self.assertEqual([], follower.poll())
+            self.assertIsNone(follower.header)
+
+            # sections and part of the data records
+            self.write(self.data[:RECORDS_OFFSET + 10 * 40])
+            self.assertEqual([], follower.poll())
+            self.assertEqual(expected.identification, follower.identification)
+            self.assertIsNone(follower.data)
+
+            # data records, 100 hires records and an incomplete one
+            self.write(self.data[:RECORDS_OFFSET + 125 * 40 + 20])
+            records = follower.poll()
+            self.assertEqual(list(expected.data), follower.data)
+            self.assertEqual(list(expected.hires[:100]), records)
+            self.assertEqual([], follower.poll())
+
+            self.write(self.data[:RECORDS_OFFSET + 1025 * 40])
+            self.assertEqual(list(expected.hires[100:1000]), follower.poll())
+            self.assertFalse(follower.ready)
+
+            self.write(self.data, file_ready=1)
+            self.assertTrue(follower.ready)
+            self.assertEqual(list(expected.hires[1000:]), follower.poll())
+
+    def test_follow_s_file(self):
+        self.write(self.data, file_ready=1)
+        with HiresFollower(self.file_name, kind='s') as follower:
+            batches = list(follower.follow(interval=0))
+        self.assertEqual(1, len(batches))
+        self.assertEqual(list(parse_s(self.s_file_name).hires), batches[0])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_poll_numpy(self):
+        self.write(self.data[:RECORDS_OFFSET + 2000 * 50])
+        with HiresFollower(self.file_name, kind='s', engine='numpy') as follower:
+            first = follower.poll()
+            self.write(self.data)
+            second = follower.poll()
+            self.assertEqual(0, len(follower.poll()))
+        expected = parse_s(self.s_file_name, engine='numpy').hires
+        self.assertEqual((2000, 8), first['counts'].shape)
+        np.testing.assert_array_equal(expected['temperature'],
+                                      np.concatenate([first['temperature'], second['temperature']]))
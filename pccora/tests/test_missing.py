@@ -0,0 +1,69 @@
+import io
+import math
+import os
+import struct
+import unittest
+
+from pccora import PCCORAParser
+from pccora.pccora import RECORDS_OFFSET, MISSING_VALUE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestMissing(unittest.TestCase):
+
+    def setUp(self):
+        s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        with open(s_file_name, 'rb') as fid:
+            content = bytearray(fid.read())
+        # logarithmic_pressure, temperature and humidity of the first hires record
+        offset = RECORDS_OFFSET + 25 * 40 + 4
+        struct.pack_into('<3h', content, offset, MISSING_VALUE, MISSING_VALUE, MISSING_VALUE)
+        self.content = bytes(content)
+
+    def parse(self, **kwargs):
+        parser = PCCORAParser(**kwargs)
+        parser.parse_stream(io.BytesIO(self.content))
+        return parser
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            PCCORAParser(missing='zero')
+
+    def test_sentinel(self):
+        record = self.parse().get_hires_data()[0]
+        self.assertEqual(MISSING_VALUE, record.temperature)
+        self.assertEqual(MISSING_VALUE, record.humidity)
+
+    def test_nan(self):
+        for engine in ('construct', 'struct'):
+            parser = self.parse(engine=engine, missing='nan')
+            record = parser.get_hires_data()[0]
+            self.assertTrue(math.isnan(record.temperature))
+            self.assertTrue(math.isnan(record.humidity))
+            self.assertTrue(math.isnan(record.spress))
+            self.assertFalse(math.isnan(record.pressure))
+            self.assertTrue(math.isnan(parser.get_identification().reserved))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_nan_columns(self):
+        hires = self.parse(engine='numpy', missing='nan').get_hires_data()
+        self.assertEqual(np.float64, hires['humidity'].dtype)
+        for name in ('logarithmic_pressure', 'temperature', 'humidity', 'spress'):
+            self.assertEqual([0], list(np.flatnonzero(np.isnan(hires[name]))))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_mask(self):
+        hires = self.parse(engine='numpy', missing='mask').get_hires_data()
+        self.assertEqual([0], list(np.flatnonzero(np.ma.getmaskarray(hires['temperature']))))
+        self.assertEqual(np.int16, hires['humidity'].dtype)
+        self.assertIs(np.ma.masked, hires['humidity'][0])
+
+        parser = self.parse(missing='mask')
+        self.assertIs(np.ma.masked, parser.get_hires_data()[0].temperature)
+        self.assertIs(np.ma.masked, parser.get_identification().reserved)
+        temperature = parser.get_sounding().hires['temperature']
+        self.assertEqual([0], list(np.flatnonzero(np.ma.getmaskarray(temperature))))
@@ -0,0 +1,108 @@
+import math
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pccora import PCCORAParser, parse_edt, parse_s, parse_z
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def assert_same_value(test, expected, actual):
+    if isinstance(expected, float) and math.isnan(expected):
+        test.assertTrue(math.isnan(actual))
+    elif isinstance(expected, list):
+        # significance keys, decoded by construct into a list of bin() strings
+        test.assertEqual(expected, [bin(actual & 0xff), bin(actual >> 8)])
+    else:
+        test.assertAlmostEqual(expected, actual)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestNumpyEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            PCCORAParser(engine='fortran')
+
+    def test_same_values_as_construct(self):
+        construct_parser = PCCORAParser()
+        construct_parser.parse_file(self.s_file_name)
+        numpy_parser = PCCORAParser(engine='numpy')
+        numpy_parser.parse_file(self.s_file_name)
+
+        self.assertEqual(construct_parser.get_header(), numpy_parser.get_header())
+        self.assertEqual(construct_parser.get_identification(), numpy_parser.get_identification())
+        self.assertEqual(construct_parser.get_syspar(), numpy_parser.get_syspar())
+
+        for records, columns in [(construct_parser.get_data(), numpy_parser.get_data()),
+                                 (construct_parser.get_hires_data(), numpy_parser.get_hires_data())]:
+            self.assertEqual(len(records), len(columns['time']))
+            for name in records[0].keys():
+                column = columns[name]
+                self.assertTrue(column.flags['C_CONTIGUOUS'])
+                for i in range(0, len(records), 97):
+                    assert_same_value(self, records[i][name], column[i])
+
+    def test_parse_stream(self):
+        parser = PCCORAParser(engine='numpy')
+        with open(self.s_file_name, 'rb') as file_stream:
+            parser.parse_stream(file_stream)
+        self.assertTrue("Vaisala" in parser.get_header().copyright)
+        self.assertEqual(7126, len(parser.get_hires_data()['temperature']))
+
+    def test_iter_hires(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        batches = list(parser.iter_hires(self.s_file_name, batch_size=4000))
+        self.assertEqual([4000, 3126], [len(batch) for batch in batches])
+        np.testing.assert_array_equal(parser.get_hires_data()['temperature'],
+                                      np.concatenate([batch['temperature'] for batch in batches]))
+
+    def test_hires_slice(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        columns = parser.hires_slice(self.s_file_name, -300)
+        self.assertEqual(300, len(columns))
+        np.testing.assert_array_equal(parser.get_hires_data()['altitude'][-300:], columns['altitude'])
+
+    def test_s_and_z_files(self):
+        for method, file_name in [('parse_s_file', self.s_file_name), ('parse_z_file', self.z_file_name)]:
+            construct_parser = PCCORAParser()
+            getattr(construct_parser, method)(file_name)
+            numpy_parser = PCCORAParser(engine='numpy')
+            getattr(numpy_parser, method)(file_name)
+
+            self.assertEqual(construct_parser.get_identification(), numpy_parser.get_identification())
+            records = construct_parser.get_hires_data()
+            columns = numpy_parser.get_hires_data()
+            self.assertEqual(len(records), len(columns))
+            self.assertEqual((len(records), 8), columns['counts'].shape)
+            self.assertEqual(np.int16, columns['counts'].dtype)
+            for i in range(0, len(records), 97):
+                for name in ['time', 'logarithmic_pressure', 'temperature', 'humidity', 'n_data', 'cycles']:
+                    assert_same_value(self, records[i][name], columns[name][i])
+                self.assertEqual([records[i]['c%d' % c] for c in range(1, 9)], list(columns['counts'][i]))
+                self.assertEqual(records[i]['buffer'], columns['buffer'][i].tobytes())
+
+    def test_threads(self):
+        result = parse_edt(self.s_file_name, engine='numpy')
+        expected = np.exp(result.hires['logarithmic_pressure'] / 4096.0)
+        # the lazy derived columns of a shared result may be accessed by many threads at once
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            columns = list(executor.map(lambda _: result.hires['spress'], range(0, 8)))
+        for column in columns:
+            np.testing.assert_array_equal(expected, column)
+
+    def test_header_record_counts(self):
+        construct_result = parse_z(self.z_file_name)
+        numpy_result = parse_z(self.z_file_name, engine='numpy')
+        self.assertEqual(len(construct_result.hires), len(numpy_result.hires))
+        self.assertEqual(5721, len(parse_s(self.s_file_name, engine='numpy').hires))
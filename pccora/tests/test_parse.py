@@ -1,7 +1,14 @@
+import io
+import mmap
 import os
+import struct
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import unittest
 
-from pccora import PCCORAParser
+from pccora import PCCORAParser, read_metadata, parse_bytes, parse_edt, parse_s, parse_z
+from pccora.pccora import RECORDS_OFFSET, HeaderMismatchWarning
 
 
 # test files from: ftp://ftp1.esrl.noaa.gov/psd3/cruises/AERO_1999/RHB/balloon/Raw/
@@ -91,3 +98,122 @@ class TestParse(unittest.TestCase):
         self.parser.parse_file(self.s_file_name)
         syspar = self.parser.get_syspar()
         self.assertTrue(len(syspar) > 0)
+
+    def test_read_metadata(self):
+        self.parser.parse_file(self.s_file_name)
+        metadata = read_metadata(self.s_file_name)
+        self.assertEqual(self.parser.get_header(), metadata.pccora_header)
+        self.assertEqual(self.parser.get_identification(), metadata.pccora_identification)
+        self.assertEqual(datetime(1993, 1, 18, 10, 24, 54), metadata.pccora_identification.launch_time)
+
+    def test_iter_hires(self):
+        self.parser.parse_file(self.s_file_name)
+        hires_data = self.parser.get_hires_data()
+        records = list(PCCORAParser().iter_hires(self.s_file_name))
+        self.assertEqual(hires_data, records)
+
+    def test_iter_hires_batches_non_seekable_stream(self):
+        self.parser.parse_file(self.s_file_name)
+        hires_data = self.parser.get_hires_data()
+        with open(self.s_file_name, 'rb') as fid:
+            stream = io.BufferedReader(io.BytesIO(fid.read()), buffer_size=7)
+            stream.seekable = lambda: False
+            batches = list(PCCORAParser().iter_hires(stream, batch_size=1000))
+        self.assertEqual([1000] * 7 + [126], [len(batch) for batch in batches])
+        self.assertEqual(hires_data, [record for batch in batches for record in batch])
+
+    def test_hires_record(self):
+        self.parser.parse_file(self.s_file_name)
+        hires_data = self.parser.get_hires_data()
+        self.assertEqual(hires_data[0], self.parser.hires_record(self.s_file_name, 0))
+        self.assertEqual(hires_data[-1], self.parser.hires_record(self.s_file_name, -1))
+        self.assertEqual(hires_data[1234], self.parser.hires_record(self.s_file_name, 1234))
+        with self.assertRaises(IndexError):
+            self.parser.hires_record(self.s_file_name, len(hires_data))
+
+    def test_hires_slice(self):
+        self.parser.parse_file(self.s_file_name)
+        hires_data = self.parser.get_hires_data()
+        self.assertEqual(hires_data[-300:], self.parser.hires_slice(self.s_file_name, -300))
+        self.assertEqual(hires_data[10:20], self.parser.hires_slice(self.s_file_name, 10, 20))
+        self.assertEqual([], self.parser.hires_slice(self.s_file_name, 20, 10))
+
+    def test_parse_functions(self):
+        self.parser.parse_file(self.s_file_name)
+        result = parse_edt(self.s_file_name)
+        self.assertEqual(self.parser.get_header(), result.header)
+        self.assertEqual(self.parser.get_identification(), result.identification)
+        self.assertEqual(self.parser.get_syspar().syspar, result.syspar)
+        self.assertEqual(tuple(self.parser.get_data()), result.data)
+        self.assertEqual(tuple(self.parser.get_hires_data()), result.hires)
+        with self.assertRaises(AttributeError):
+            result.header = None
+
+        self.parser.parse_s_file(self.s_file_name)
+        self.assertEqual(tuple(self.parser.get_hires_data()), parse_s(self.s_file_name, engine='struct').hires)
+        self.parser.parse_z_file(self.z_file_name)
+        result = parse_z(self.z_file_name)
+        self.assertIsNone(result.data)
+        self.assertEqual(tuple(self.parser.get_hires_data()), result.hires)
+
+        with open(self.z_file_name, 'rb') as fid:
+            self.assertEqual(result, parse_bytes(fid.read(), kind='z'))
+        with self.assertRaises(ValueError):
+            parse_bytes(b'', kind='x')
+
+    def test_parse_functions_threads(self):
+        expected = parse_edt(self.s_file_name, engine='struct')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: parse_edt(self.s_file_name, engine='struct'), range(0, 8)))
+        for result in results:
+            self.assertEqual(expected, result)
+
+    def test_parse_bytes_buffers(self):
+        expected = parse_edt(self.s_file_name, engine='struct')
+        with open(self.s_file_name, 'rb') as fid:
+            data = fid.read()
+            file_map = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = bytearray(b'\0' * 10 + data)
+        for engine in ('construct', 'struct'):
+            self.assertEqual(expected, parse_bytes(bytearray(data), engine=engine))
+            self.assertEqual(expected, parse_bytes(memoryview(buf)[10:], engine=engine))
+            self.assertEqual(expected, parse_bytes(file_map, engine=engine))
+        # the result does not reference the buffer
+        file_map.close()
+        result = parse_bytes(buf[10:], engine='struct')
+        buf[:] = b'\0' * len(buf)
+        self.assertEqual(expected, result)
+
+    def test_header_record_counts(self):
+        with open(self.s_file_name, 'rb') as fid:
+            data = fid.read()
+        # 10 standard levels and 7141 hires records of 40 bytes, which the greedy ranges would read as 25 and 7126
+        buf = bytearray(data[:RECORDS_OFFSET + 7151 * 40])
+        struct.pack_into('<hh', buf, 24, 7141, 10)
+        struct.pack_into('<h', buf, 30, 40)
+        for engine in ('construct', 'struct'):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', HeaderMismatchWarning)
+                result = parse_bytes(buf, engine=engine)
+            self.assertEqual(10, len(result.data))
+            self.assertEqual(7141, len(result.hires))
+
+        # one more byte, the header data count is still used, and the hires records counted from the file size
+        buf.append(0)
+        for engine in ('construct', 'struct'):
+            with self.assertWarns(HeaderMismatchWarning):
+                result = parse_bytes(buf, engine=engine)
+            self.assertEqual((10, 7141), (len(result.data), len(result.hires)))
+        struct.pack_into('<h', buf, 26, 30)
+        with self.assertWarns(HeaderMismatchWarning):
+            result = parse_bytes(buf, engine='struct')
+        self.assertEqual((25, 7126), (len(result.data), len(result.hires)))
+
+    def test_header_record_counts_mismatch(self):
+        # the header of the Z file does not match its records
+        with self.assertWarns(HeaderMismatchWarning):
+            result = parse_z(self.z_file_name, engine='struct')
+        self.assertEqual(2696, len(result.hires))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', HeaderMismatchWarning)
+            self.assertEqual(5721, len(parse_s(self.s_file_name, engine='struct').hires))
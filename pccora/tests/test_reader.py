@@ -0,0 +1,88 @@
+import os
+import unittest
+
+from pccora import PCCORAParser, PCCORAReader, parse_edt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestReader(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+
+    def test_sections(self):
+        parser = PCCORAParser()
+        parser.parse_file(self.s_file_name)
+        with PCCORAReader(self.s_file_name) as reader:
+            self.assertEqual(parser.get_header(), reader.header)
+            self.assertEqual(parser.get_identification(), reader.identification)
+            self.assertEqual(parser.get_syspar().syspar, reader.syspar.tobytes())
+            self.assertEqual(os.path.getsize(self.s_file_name) - 8333, len(reader.records))
+
+    def test_close(self):
+        reader = PCCORAReader(self.s_file_name)
+        syspar = reader.syspar
+        with reader:
+            self.assertFalse(reader.closed)
+        self.assertTrue(reader.closed)
+        with self.assertRaises(ValueError):
+            syspar.tobytes()
+        with self.assertRaises(ValueError):
+            reader.get_records_view()
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_close_exported_views(self):
+        with open(self.s_file_name, 'rb') as fid:
+            expected = fid.read()
+        reader = PCCORAReader(self.s_file_name, kind='s')
+        records = np.frombuffer(reader.records, dtype=np.uint8)
+        syspar = np.frombuffer(reader.syspar, dtype=np.uint8)
+        reader.close()
+        self.assertTrue(reader.closed)
+        with self.assertRaises(ValueError):
+            reader.get_header_view()
+        # the arrays keep the mapping open until they are deleted
+        self.assertEqual(expected[8333:], records.tobytes())
+        self.assertEqual(expected[246:8333], syspar.tobytes())
+        reader.close()
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_z_file(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_z_file(self.z_file_name)
+        with PCCORAReader(self.z_file_name, kind='z') as reader:
+            np.testing.assert_array_equal(parser.get_hires_data()['counts'], reader.hires['counts'])
+            self.assertEqual(2696, len(reader.hires))
+            with self.assertRaises(ValueError):
+                reader.data
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_lazy_columns(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        with PCCORAReader(self.s_file_name) as reader:
+            temperature = reader.hires['temperature']
+            data = reader.data
+            self.assertEqual(len(parser.get_hires_data()), len(reader.hires))
+        np.testing.assert_array_equal(parser.get_hires_data()['temperature'], temperature)
+        # not accessed before closing the reader
+        with self.assertRaises(ValueError):
+            data['time']
+
+    def test_parse(self):
+        expected = parse_edt(self.s_file_name, engine='struct')
+        with PCCORAReader(self.s_file_name) as reader:
+            result = reader.parse(engine='struct')
+        self.assertEqual(expected, result)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_parse_numpy(self):
+        expected = parse_edt(self.s_file_name, engine='numpy')
+        with PCCORAReader(self.s_file_name) as reader:
+            result = reader.parse()
+        np.testing.assert_array_equal(expected.hires['temperature'], result.hires['temperature'])
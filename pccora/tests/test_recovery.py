@@ -0,0 +1,63 @@
+import os
+import unittest
+from unittest import mock
+
+from construct import FieldError
+
+from pccora import parse_s, recover_bytes, recover_file, Problem, recovery
+from pccora.pccora import RECORDS_OFFSET
+from pccora.recovery import check_records
+
+
+class TestRecovery(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+        with open(self.s_file_name, 'rb') as fid:
+            self.data = fid.read()
+
+    def test_clean_file(self):
+        result, problems = recover_file(self.s_file_name, kind='s', engine='struct')
+        self.assertEqual([], problems)
+        self.assertEqual(parse_s(self.s_file_name, engine='struct'), result)
+
+    def test_truncated_file(self):
+        result, problems = recover_bytes(self.data[:-75], kind='s', engine='struct')
+        self.assertEqual(5719, len(result.hires))
+        self.assertEqual(parse_s(self.s_file_name, engine='struct').hires[:5719], result.hires)
+        offset = RECORDS_OFFSET + 5719 * 50
+        self.assertEqual([Problem(offset, 'incomplete record of 25 bytes'),
+                          Problem(offset, 'the header has 5721 records, the file 5719')], problems)
+
+    def test_corrupt_record(self):
+        buf = bytearray(self.data)
+        offset = RECORDS_OFFSET + 3000 * 50
+        buf[offset:offset + 50] = b'\xff' * 50
+        for engine in ('construct', 'struct'):
+            result, problems = recover_bytes(buf, kind='s', engine=engine)
+            self.assertEqual(3000, len(result.hires))
+            self.assertEqual([Problem(offset, 'record 3000: invalid time -1')], problems)
+
+    @unittest.skipIf(recovery.np is None, "NumPy is not installed")
+    def test_check_records_without_numpy(self):
+        # the vectorized checks find the same first problem as the records checked one at a time
+        buf = bytearray(self.data)
+        for index, field, value in ((4000, 4, b'\xff\x7f'), (2500, 0, b'\x10\x00'), (900, 2, b'\xff\x7f')):
+            offset = RECORDS_OFFSET + index * 50 + field
+            buf[offset:offset + len(value)] = value
+            expected = check_records(buf, RECORDS_OFFSET, 5721, 's')
+            self.assertEqual(index, expected[0])
+            with mock.patch.object(recovery, 'np', None):
+                self.assertEqual(expected, check_records(buf, RECORDS_OFFSET, 5721, 's'))
+
+    def test_time_not_increasing(self):
+        # the Z records do not have the layout of the S records they are decoded with
+        result, problems = recover_file(self.z_file_name, kind='z')
+        self.assertEqual(2, len(result.hires))
+        self.assertEqual(RECORDS_OFFSET + 2 * 50, problems[0].offset)
+        self.assertTrue('before the time of the previous record' in problems[0].reason)
+
+    def test_truncated_sections(self):
+        with self.assertRaises(FieldError):
+            recover_bytes(self.data[:RECORDS_OFFSET - 1], kind='s')
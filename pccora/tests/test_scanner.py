@@ -0,0 +1,108 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from pccora.scanner import scan_directory, scan_files, scan_file, guess_kind, find_files, MetadataTable, COLUMNS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        tests_directory = os.path.dirname(__file__)
+        os.makedirs(os.path.join(self.directory, "1993", "01"))
+        self.s_file_name = os.path.join(self.directory, "1993", "01", "93011809.21S")
+        self.z_file_name = os.path.join(self.directory, "1993", "93011809.21Z")
+        shutil.copy(os.path.join(tests_directory, "93011809.21S"), self.s_file_name)
+        shutil.copy(os.path.join(tests_directory, "93011809.21Z"), self.z_file_name)
+        self.short_file_name = os.path.join(self.directory, "93011809.EDT")
+        with open(self.short_file_name, 'wb') as fid:
+            fid.write(b'\0' * 100)
+        with open(os.path.join(self.directory, "93011809.txt"), 'w') as fid:
+            fid.write("not a PC-CORA file")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_guess_kind(self):
+        self.assertEqual('s', guess_kind(self.s_file_name))
+        self.assertEqual('z', guess_kind(self.z_file_name))
+        self.assertEqual('edt', guess_kind(self.short_file_name))
+        self.assertEqual('edt', guess_kind("93011809.21E"))
+
+    def test_find_files(self):
+        self.assertEqual([self.short_file_name, self.z_file_name, self.s_file_name],
+                         list(find_files(self.directory)))
+
+    def test_scan_file(self):
+        row = scan_file(self.s_file_name)
+        self.assertEqual(set(COLUMNS), set(row))
+        self.assertEqual('s', row['kind'])
+        self.assertEqual(os.path.getsize(self.s_file_name), row['size'])
+        self.assertEqual((2, 313), (row['wmo_block_number'], row['wmo_station_number']))
+        self.assertAlmostEqual(60.28, row['station_latitude'])
+        self.assertEqual(datetime(1993, 1, 18, 9, 21), row['datetime'])
+        self.assertEqual(datetime(1993, 1, 18, 10, 24, 54), row['launch_time'])
+        self.assertEqual(' 183229843', row['radiosonde_number'])
+        self.assertEqual((0, 5721, True), (row['data_count'], row['hires_count'], row['header_matches']))
+        self.assertIsNone(row['error'])
+
+        # the header of the Z file does not match its size
+        row = scan_file(self.z_file_name)
+        self.assertEqual(5, row['reason_termination'])
+        self.assertEqual((0, 2696, False), (row['data_count'], row['hires_count'], row['header_matches']))
+
+    def test_scan_errors(self):
+        row = scan_file(self.short_file_name)
+        self.assertEqual(100, row['size'])
+        self.assertIsNone(row['wmo_station_number'])
+        self.assertIn("found 100", row['error'])
+        row = scan_file(os.path.join(self.directory, "missing.EDT"))
+        self.assertIsNone(row['size'])
+        self.assertIsNotNone(row['error'])
+
+    def test_scan_directory(self):
+        table = scan_directory(self.directory, workers=2)
+        self.assertEqual(3, len(table))
+        self.assertEqual([self.short_file_name, self.z_file_name, self.s_file_name], table['path'])
+        self.assertEqual(['edt', 'z', 's'], table['kind'])
+        self.assertEqual([None, 313, 313], table['wmo_station_number'])
+        self.assertEqual(table['path'], [row['path'] for row in table.rows()])
+
+        # forcing the kind of every file
+        table = scan_files([self.s_file_name], kind='z')
+        self.assertEqual(['z'], table['kind'])
+        with self.assertRaises(ValueError):
+            scan_files([self.s_file_name], kind='x')
+
+    def test_to_csv(self):
+        table = scan_directory(self.directory)
+        csv_file_name = os.path.join(self.directory, "metadata.csv")
+        table.to_csv(csv_file_name)
+        with open(csv_file_name, newline='') as fid:
+            rows = list(csv.DictReader(fid))
+        self.assertEqual(list(COLUMNS), list(rows[0].keys()))
+        self.assertEqual(['', '313', '313'], [row['wmo_station_number'] for row in rows])
+        self.assertEqual('1993-01-18 10:24:54', rows[1]['launch_time'])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_to_arrays(self):
+        arrays = scan_directory(self.directory).to_arrays()
+        self.assertEqual(list(COLUMNS), list(arrays))
+        self.assertEqual(np.datetime64('1993-01-18T10:24:54'), arrays['launch_time'][1])
+        self.assertTrue(np.isnat(arrays['launch_time'][0]))
+        np.testing.assert_array_equal([np.nan, 313, 313], arrays['wmo_station_number'])
+        np.testing.assert_array_equal([False, False, True], arrays['header_matches'])
+        self.assertEqual(0, len(MetadataTable().to_arrays()['path']))
+
+
+if __name__ == '__main__':
+    unittest.main()
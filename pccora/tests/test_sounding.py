@@ -0,0 +1,145 @@
+import math
+import os
+import pickle
+from datetime import datetime
+import unittest
+
+from pccora import PCCORAParser
+
+try:
+    import numpy as np
+    from pccora import Columns, Sounding
+    from pccora.numpy_engine import EXTRA_COLUMNS
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestSounding(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+
+    def test_columns_length(self):
+        columns = Columns({'time': np.zeros(3), 'temperature': np.ones(3)})
+        self.assertEqual(3, len(columns))
+        self.assertEqual(['time', 'temperature'], list(columns))
+        self.assertTrue('temperature' in columns)
+        with self.assertRaises(ValueError):
+            Columns({'time': np.zeros(3), 'temperature': np.ones(2)})
+
+    def test_get_sounding(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        sounding = parser.get_sounding()
+        self.assertTrue(isinstance(sounding, Sounding))
+        self.assertTrue("Vaisala" in sounding.header.copyright)
+        self.assertEqual(2, sounding.identification.wmo_block_number)
+        self.assertEqual(8087, len(sounding.syspar))
+        self.assertEqual(25, len(sounding.data))
+        self.assertEqual(7126, len(sounding.hires))
+        self.assertEqual((7126,), sounding.hires["temperature"].shape)
+
+    def test_get_sounding_from_construct_engine(self):
+        construct_parser = PCCORAParser()
+        construct_parser.parse_file(self.s_file_name)
+        numpy_parser = PCCORAParser(engine='numpy')
+        numpy_parser.parse_file(self.s_file_name)
+
+        expected = numpy_parser.get_sounding()
+        sounding = construct_parser.get_sounding()
+        # the numpy engine also has the exact wind speed, which the construct decoder truncates
+        self.assertEqual([name for name in expected.hires if name not in EXTRA_COLUMNS], list(sounding.hires))
+        np.testing.assert_array_equal(np.trunc(expected.hires['exact_wind_speed']), sounding.hires['wind_speed'])
+        for name in sounding.hires:
+            if name == 'datetime':
+                np.testing.assert_array_equal(expected.hires[name], sounding.hires[name])
+            else:
+                np.testing.assert_allclose(expected.hires[name], sounding.hires[name])
+
+    def test_s_file_engines(self):
+        expected = None
+        for engine in ('numpy', 'construct', 'struct'):
+            parser = PCCORAParser(engine=engine)
+            parser.parse_s_file(self.s_file_name)
+            hires = parser.get_sounding().hires
+            if expected is None:
+                expected = hires
+                continue
+            self.assertEqual(list(expected), list(hires))
+            for name in ('counts', 'buffer'):
+                self.assertEqual((expected[name].dtype, expected[name].shape), (hires[name].dtype, hires[name].shape))
+                np.testing.assert_array_equal(expected[name], hires[name])
+        self.assertEqual((5721, 20), expected['buffer'].shape)
+
+    def test_get_sounding_z_file(self):
+        parser = PCCORAParser()
+        parser.parse_z_file(self.z_file_name)
+        sounding = parser.get_sounding()
+        self.assertEqual(0, len(sounding.data))
+        self.assertEqual(len(parser.get_hires_data()), len(sounding.hires))
+        self.assertEqual(parser.get_hires_data()[10].c1, sounding.hires['counts'][10, 0])
+        self.assertEqual(parser.get_hires_data()[10].c8, sounding.hires['counts'][10, 7])
+
+    def test_significance_keys(self):
+        columns = Columns({'significance_key': np.array([0x0001, 0x0000, 0x0101, 0x0100], dtype=np.uint16)})
+        np.testing.assert_array_equal([True, False, True, False], columns.is_standard_level())
+        np.testing.assert_array_equal([2, 3], columns.levels_with_flag(0x0100))
+        np.testing.assert_array_equal([0, 2, 3], columns.levels_with_flag(0x0101))
+
+    def test_significance_keys_from_construct_engine(self):
+        parser = PCCORAParser()
+        parser.parse_file(self.z_file_name)
+        data = parser.get_sounding().data
+        self.assertEqual(np.uint16, data['recalculated_significance_key'].dtype)
+        # ['0b10100100', '0b11100000']
+        self.assertEqual(0xe0a4, data['recalculated_significance_key'][0])
+        self.assertEqual(0, data.levels_with_flag(0xffff)[0])
+
+    def test_derived_columns(self):
+        columns = Columns({'time': np.array([0.0, 1.5, -32768.0], dtype=np.float32),
+                           'logarithmic_pressure': np.array([28000, 0, -32768], dtype=np.int16),
+                           'north_wind': np.array([-10.0, 0.0, -32768]),
+                           'east_wind': np.array([0.0, -5.0, 3.0])})
+        sounding = Sounding(header=None, identification={'launch_time': datetime(1993, 1, 18, 10, 24, 54)},
+                            syspar=b'', data=Columns({}), hires=columns)
+        self.assertEqual(['time', 'logarithmic_pressure', 'north_wind', 'east_wind', 'spress', 'computed_wind_speed',
+                          'computed_wind_direction', 'datetime'], list(sounding.hires))
+        # only computed on first access
+        self.assertFalse('spress' in columns._columns)
+        np.testing.assert_allclose([math.exp(28000 / 4096.0), 1.0], sounding.hires['spress'][:2])
+        np.testing.assert_allclose([10.0, 5.0, -32768], sounding.hires['computed_wind_speed'])
+        # wind blowing towards the south comes from the north, towards the west from the east
+        np.testing.assert_allclose([0.0, 90.0, -32768], sounding.hires['computed_wind_direction'])
+        self.assertEqual([np.datetime64('1993-01-18T10:24:54.000'), np.datetime64('1993-01-18T10:24:55.500')],
+                         list(sounding.hires['datetime'][:2]))
+        self.assertTrue(np.isnat(sounding.hires['datetime'][2]))
+
+    def test_pickle(self):
+        parser = PCCORAParser(engine='numpy')
+        parser.parse_file(self.s_file_name)
+        sounding = parser.get_sounding()
+        # derived columns already computed are not pickled
+        sounding.hires['spress']
+        restored = pickle.loads(pickle.dumps(sounding, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(sounding.header, restored.header)
+        self.assertEqual(sounding.identification, restored.identification)
+        self.assertEqual(sounding.syspar, restored.syspar)
+        self.assertEqual(list(sounding.hires), list(restored.hires))
+        self.assertTrue('spress' in restored.hires._loaders)
+        for columns, restored_columns in [(sounding.data, restored.data), (sounding.hires, restored.hires)]:
+            for name in columns:
+                np.testing.assert_array_equal(columns[name], restored_columns[name])
+
+    def test_compact_masked_columns(self):
+        columns = Columns({'time': np.ma.masked_array([1.0, 2.0, 3.0], mask=[False, True, False]),
+                           'counts': np.arange(24, dtype=np.int16).reshape(3, 8),
+                           'humidity': np.array([1, 2, 3], dtype=np.int16)})
+        layout, buffer = columns.to_compact()
+        self.assertTrue(isinstance(buffer, bytearray))
+        restored = Columns.from_compact(layout, buffer)
+        self.assertEqual([False, True, False], list(np.ma.getmaskarray(restored['time'])))
+        np.testing.assert_array_equal(columns['counts'], restored['counts'])
+        np.testing.assert_array_equal(columns['humidity'], restored['humidity'])
+        self.assertEqual(['time', 'counts'], list(Columns.from_compact(*columns.to_compact(exclude=['humidity']))))
@@ -0,0 +1,37 @@
+import os
+import unittest
+
+from pccora import PCCORAParser
+from pccora.struct_engine import header_layout, identification_layout
+
+
+class TestStructEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        self.z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+
+    def test_layout_sizes(self):
+        self.assertEqual(50, header_layout.size)
+        self.assertEqual(196, identification_layout.size)
+
+    def test_same_result_as_construct(self):
+        for method, file_name in [('parse_file', self.s_file_name),
+                                  ('parse_s_file', self.s_file_name),
+                                  ('parse_z_file', self.z_file_name)]:
+            construct_parser = PCCORAParser()
+            getattr(construct_parser, method)(file_name)
+            struct_parser = PCCORAParser(engine='struct')
+            getattr(struct_parser, method)(file_name)
+            self.assertEqual(list(construct_parser.get_result().keys()), list(struct_parser.get_result().keys()))
+            self.assertEqual(construct_parser.get_result(), struct_parser.get_result())
+            self.assertEqual(list(construct_parser.get_identification().keys()),
+                             list(struct_parser.get_identification().keys()))
+
+    def test_hires_record(self):
+        construct_parser = PCCORAParser()
+        struct_parser = PCCORAParser(engine='struct')
+        self.assertEqual(construct_parser.hires_record(self.s_file_name, -1),
+                         struct_parser.hires_record(self.s_file_name, -1))
+        self.assertEqual(construct_parser.hires_slice(self.s_file_name, 100, 200),
+                         struct_parser.hires_slice(self.s_file_name, 100, 200))
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from datetime import datetime
+
+from pccora import parse_bytes, recover_bytes
+from pccora.pccora import MISSING_VALUE, HeaderMismatchWarning
+from pccora.scanner import scan_directory
+
+try:
+    import numpy as np
+    from pccora.synthetic import generate_sounding, generate_bytes, generate_archive, corrupt_bytes, \
+        CORRUPTIONS, STANDARD_PRESSURES
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestSynthetic(unittest.TestCase):
+
+    def test_deterministic(self):
+        self.assertEqual(generate_bytes('s', seed=3), generate_bytes('s', seed=3))
+        self.assertNotEqual(generate_bytes('s', seed=3), generate_bytes('s', seed=4))
+
+    def test_clean_files(self):
+        for kind in ('edt', 's', 'z'):
+            buf = generate_bytes(kind, records=500)
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', HeaderMismatchWarning)
+                for engine in ('construct', 'numpy', 'struct'):
+                    result = parse_bytes(buf, kind, engine=engine)
+                    self.assertEqual(500, len(result.hires))
+            # every record is plausible
+            self.assertEqual([], recover_bytes(buf, kind)[1])
+
+    def test_profile(self):
+        sounding = generate_sounding('edt', records=3000, launch_time=datetime(1998, 7, 1, 23, 10))
+        self.assertEqual(datetime(1998, 7, 1, 23, 10), sounding.launch_time)
+        self.assertEqual(23, sounding.identification.hour)
+        hires = sounding.hires
+        self.assertTrue(np.all(np.diff(hires['time']) > 0))
+        self.assertTrue(np.all(np.diff(hires['pressure']) <= 0.2))
+        self.assertTrue(-60 < hires['temperature'].min() < hires['temperature'].max() < 20)
+        # the standard levels reached by the sounding, about 12 hPa at 30 km
+        data = sounding.data
+        self.assertEqual(len(STANDARD_PRESSURES[:15]), len(data))
+        np.testing.assert_allclose(STANDARD_PRESSURES[:15], data['pressure'], rtol=0.01)
+        self.assertTrue(data.is_standard_level().all())
+        self.assertEqual(5, len(generate_sounding('edt', standard_levels=5).data))
+        # too short to reach any standard level, the surface record is the only data record
+        data = generate_sounding('edt', records=10).data
+        self.assertEqual(1, len(data))
+        self.assertFalse(data.is_standard_level().any())
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', HeaderMismatchWarning)
+            result = parse_bytes(generate_bytes('edt', records=10), 'edt', engine='numpy')
+        self.assertEqual((1, 10), (len(result.data), len(result.hires)))
+
+    def test_long_soundings(self):
+        # eight hours of S records, and EDT records, going past the balloon burst and back to the ground
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            for kind, records, interval in (('s', 28800, 1.0), ('z', 15000, 2.0), ('edt', 8000, 2.0)):
+                buf = generate_bytes(kind, records=records, interval=interval)
+                result = parse_bytes(buf, kind, engine='numpy')
+                self.assertEqual(records, len(result.hires))
+                self.assertEqual([], recover_bytes(buf, kind)[1])
+        altitude = generate_sounding('edt', records=8000).hires['altitude']
+        self.assertTrue(31000 < altitude.max() < 33000)
+        self.assertTrue(altitude[-1] < 100)
+
+    def test_missing_values(self):
+        sounding = generate_sounding('s', records=1000, missing_fraction=0.1)
+        missing = np.mean(sounding.hires['temperature'] == MISSING_VALUE)
+        self.assertTrue(0.05 < missing < 0.15)
+        result = parse_bytes(generate_bytes('s', records=1000, missing_fraction=0.1), 's', engine='numpy',
+                             missing='mask')
+        self.assertTrue(result.hires['temperature'].mask.any())
+
+    def test_corruptions(self):
+        for kind in ('edt', 's', 'z'):
+            for corruption in CORRUPTIONS:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', HeaderMismatchWarning)
+                    _, problems = recover_bytes(generate_bytes(kind, corruption=corruption), kind)
+                self.assertNotEqual([], problems, (kind, corruption))
+        with self.assertRaises(ValueError):
+            corrupt_bytes(generate_bytes('s'), 'flip')
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            generate_sounding('x')
+        with self.assertRaises(ValueError):
+            generate_sounding('edt', standard_levels=26)
+        with self.assertRaises(ValueError):
+            generate_sounding('s', records=40000)
+
+    def test_archive(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = generate_archive(directory, soundings=4, records=100)
+            self.assertEqual(12, len(paths))
+            self.assertEqual(os.path.join(directory, '1995', '01', '95010111.15E'), paths[0])
+            self.assertEqual(os.path.join(directory, '1995', '01', '95010223.15Z'), paths[-1])
+            table = scan_directory(directory)
+            self.assertEqual(12, len(table))
+            self.assertEqual([True] * 12, table['header_matches'])
+            self.assertEqual(datetime(1995, 1, 2, 23, 15), max(table['launch_time']))
+            self.assertEqual(sorted(set(table['radiosonde_number'])), sorted(table['radiosonde_number'])[::3])
+            # every file has its own SYSPAR noise, the same for the same seed
+            contents = []
+            for path in paths:
+                with open(path, 'rb') as fid:
+                    contents.append(fid.read())
+            self.assertEqual(12, len(set(content[246:8333] for content in contents)))
+            generate_archive(directory, soundings=4, records=100)
+            for path, content in zip(paths, contents):
+                with open(path, 'rb') as fid:
+                    self.assertEqual(content, fid.read())
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
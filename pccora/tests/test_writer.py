@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from collections import OrderedDict
+
+from pccora import PCCORAParser, parse_bytes, parse_edt
+from pccora.pccora import HeaderMismatchWarning
+
+try:
+    import numpy as np
+    from pccora import Columns, Sounding
+    from pccora.writer import write_bytes, write_edt, write_s, encode_column
+    from pccora.numpy_engine import data_dtype
+    from pccora.synthetic import generate_bytes
+except ImportError:
+    np = None
+
+
+def edt_columns(count, start=0):
+    """Columns with every EDT record field, and distinct values for each record"""
+    index = np.arange(start, start + count)
+    columns = OrderedDict()
+    for name in data_dtype.names:
+        columns[name] = index.astype(np.float64) + 1
+    columns['time'] = index.astype(np.float32) * 2
+    columns['temperature'] = index * 0.1 - 50.0
+    columns['altitude'] = index * 5.0 + 10.0
+    columns['wind_speed'] = index.astype(np.int64)
+    columns['significance_key'] = np.full(count, 0x0001, dtype=np.uint16)
+    columns['recalculated_significance_key'] = np.zeros(count, dtype=np.uint16)
+    return Columns(columns)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.s_file_name = os.path.join(os.path.dirname(__file__), "93011809.21S")
+        with open(self.s_file_name, 'rb') as fid:
+            self.s_bytes = fid.read()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_s_round_trip(self):
+        # the same bytes, whatever the missing values policy
+        for missing in ('sentinel', 'nan', 'mask'):
+            sounding = Sounding.from_result(parse_bytes(self.s_bytes, 's', engine='numpy', missing=missing))
+            self.assertEqual(self.s_bytes, bytes(write_bytes(sounding, 's')))
+
+        # also from the construct records
+        parser = PCCORAParser()
+        parser.parse_s_file(self.s_file_name)
+        s_file_name = os.path.join(self.directory, "93011809.21S")
+        write_s(parser.get_sounding(), s_file_name)
+        with open(s_file_name, 'rb') as fid:
+            self.assertEqual(self.s_bytes, fid.read())
+
+    def test_edt_round_trip(self):
+        s_sounding = Sounding.from_result(parse_bytes(self.s_bytes, 's', engine='numpy'))
+        data = edt_columns(3)
+        hires = edt_columns(10, start=3)
+        hires['temperature'][4] = -32768
+        sounding = Sounding(s_sounding.header, s_sounding.identification, s_sounding.syspar, data, hires)
+        edt_file_name = os.path.join(self.directory, "93011809.EDT")
+        write_edt(sounding, edt_file_name, recount=True)
+        self.assertEqual(8333 + 13 * 40, os.path.getsize(edt_file_name))
+
+        for engine in ('construct', 'numpy', 'struct'):
+            result = parse_edt(edt_file_name, engine=engine)
+            self.assertEqual((3, 10, 40), (result.header.standard_levels, result.header.data_records,
+                                           result.header.data_length))
+            self.assertEqual(s_sounding.identification, result.identification)
+            self.assertEqual(s_sounding.syspar, result.syspar)
+            parsed = Sounding.from_result(result)
+            for expected, columns in ((data, parsed.data), (hires, parsed.hires)):
+                for name in data_dtype.names:
+                    np.testing.assert_allclose(expected[name], columns[name], err_msg=name)
+
+        # NaN and masked values are written as missing values
+        masked = Sounding.from_result(parse_edt(edt_file_name, engine='numpy', missing='mask'))
+        self.assertTrue(masked.hires['temperature'].mask[4])
+        self.assertEqual(write_bytes(sounding, recount=True), write_bytes(masked))
+        nan = Sounding.from_result(parse_edt(edt_file_name, engine='numpy', missing='nan'))
+        self.assertEqual(write_bytes(sounding, recount=True), write_bytes(nan))
+
+    def test_edt_bytes_round_trip(self):
+        # wind speeds with the 0.01 m/s precision of the files, which the wind_speed column truncates
+        buf = generate_bytes('edt', records=500)
+        records = np.frombuffer(buf, dtype=data_dtype, offset=8333)
+        records['wind_speed'] = np.random.RandomState(0).randint(0, 6000, size=len(records))
+        records['wind_speed'][7] = -32768
+        buf = bytes(buf)
+        edt_file_name = os.path.join(self.directory, "95010111.15E")
+        with open(edt_file_name, 'wb') as fid:
+            fid.write(buf)
+        for missing in ('sentinel', 'nan', 'mask'):
+            sounding = Sounding.from_result(parse_edt(edt_file_name, engine='numpy', missing=missing))
+            self.assertEqual(buf, bytes(write_bytes(sounding)), missing)
+        raw = records['wind_speed'][len(sounding.data):]
+        np.testing.assert_allclose(raw[raw != -32768] * 0.01, sounding.hires['exact_wind_speed'].compressed())
+        self.assertEqual(int(raw[0] * 0.01), sounding.hires['wind_speed'][0])
+
+    def test_header_counts(self):
+        # the Z file header counts do not match its records, they are kept unless recounted
+        z_file_name = os.path.join(os.path.dirname(__file__), "93011809.21Z")
+        with open(z_file_name, 'rb') as fid:
+            z_bytes = fid.read()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', HeaderMismatchWarning)
+            sounding = Sounding.from_result(parse_bytes(z_bytes, 'z', engine='numpy'))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            buf = write_bytes(sounding, 'z')
+        self.assertEqual([HeaderMismatchWarning], [warning.category for warning in caught])
+        # the same bytes, except for the 40 bytes following the last complete record
+        self.assertEqual(z_bytes[:len(buf)], bytes(buf))
+        self.assertEqual(len(z_bytes) - 40, len(buf))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', HeaderMismatchWarning)
+            result = parse_bytes(write_bytes(sounding, 'z', recount=True), 'z')
+        self.assertEqual((2696, 50), (result.header.data_records, result.header.data_length))
+
+    def test_encode_column(self):
+        dtype = np.dtype('<i2')
+        np.testing.assert_array_equal([-500, 1, -32768, -32768],
+                                      encode_column(np.array([-50.0, 0.1, np.nan, -32768]), lambda c: c * 10, dtype))
+        with self.assertRaises(ValueError):
+            encode_column(np.array([4000.0]), lambda c: c * 10, dtype)
+
+    def test_invalid_arguments(self):
+        sounding = Sounding.from_result(parse_bytes(self.s_bytes, 's', engine='numpy'))
+        with self.assertRaises(ValueError):
+            write_bytes(sounding, 'x')
+        # data records are required for PC-CORA (EDT) files
+        with self.assertRaises(ValueError):
+            write_bytes(sounding, 'edt', recount=True)
+        sounding.syspar = sounding.syspar[:-1]
+        with self.assertRaises(ValueError):
+            write_bytes(sounding, 's')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+"""
+Vectorized writer of PC-CORA files.
+
+The inverse of the numpy engine: each column of a ``Sounding`` is scaled back to its raw value for the whole
+section at once, missing values (the ``MISSING_VALUE`` sentinel, NaN, or masked, whatever the missing values
+policy used to parse the file) are written as ``MISSING_VALUE``, and the records are stored straight into the
+output buffer through a structured array over it. The header, identification and SYSPAR sections are packed with
+the ``struct`` engine layouts.
+"""
+
+import math
+import warnings
+
+import numpy as np
+
+from .pccora import RECORDS_OFFSET, MISSING_VALUE, IDENTIFICATION_OFFSET, SYSPAR_OFFSET, HeaderMismatchWarning, \
+    _check_kind
+from .numpy_engine import data_dtype, HIRES_LAYOUTS
+from .struct_engine import header_layout, identification_layout, syspar_layout
+
+# Header ``file_ready`` values. Any other value is decoded as ``UNKNOWN``, written as the first of them.
+_FILE_READY = {'NOT_READY': 0, 'READY': 1, 'UNKNOWN': 2}
+
+
+def _is_missing(value):
+    return value is None or value is np.ma.masked or isinstance(value, float) and math.isnan(value)
+
+
+def _section_scale(factor):
+    def encoder(value):
+        return value if value == MISSING_VALUE else int(round(value * factor))
+
+    return encoder
+
+
+def _section_string(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def _section_year(value):
+    return value if value == MISSING_VALUE else value % 100
+
+
+def _section_file_ready(value):
+    return _FILE_READY.get(value, 2) if isinstance(value, str) else value
+
+
+# Encoders of the header and identification values, the inverse of the ``struct`` engine decoders
+SECTION_ENCODERS = {
+    'copyright': _section_string,
+    'file_ready': _section_file_ready,
+    'station_latitude': _section_scale(100),
+    'station_longitude': _section_scale(100),
+    'year': _section_year,
+    'cloud_group': _section_string,
+    'weather_group': _section_string,
+    'napp': _section_string,
+    'surface_pressure': _section_scale(10),
+    'surface_temperature': _section_scale(10),
+    'radiosonde_number': _section_string,
+    'sounding_number': _section_string,
+    'pressure_correction': _section_scale(10),
+    'temperature_correction': _section_scale(10),
+    'reference_pressure': _section_scale(10),
+    'reference_temperature': _section_scale(10)
+}
+
+
+def _scale(factor):
+    def encoder(column):
+        return column * factor
+
+    return encoder
+
+
+def _offset(value):
+    def encoder(column):
+        return column - value
+
+    return encoder
+
+
+# Column encoders, the inverse of ``DATA_DECODERS``, ``HIRES_DECODERS`` and ``S_HIRES_DECODERS``. Columns not
+# listed are written as-is.
+DATA_ENCODERS = {
+    'temperature': _scale(10),
+    'north_wind': _scale(10),
+    'east_wind': _scale(10),
+    'altitude': _offset(30000.0),
+    'pressure': _scale(10),
+    'dew_point_temperature': _scale(10),
+    'wind_speed': _scale(100),
+    'longitude': _scale(10),
+    'latitude': _scale(10)
+}
+
+HIRES_ENCODERS = dict(DATA_ENCODERS, mixing_ratio=_scale(10))
+
+# Fields written from another column when the ``Columns`` have it, as (column, encoder): the exact wind speed of the
+# numpy engine (see ``numpy_engine.EXTRA_COLUMNS``), as ``wind_speed`` is truncated to whole m/s.
+EXACT_COLUMNS = {
+    'wind_speed': ('exact_wind_speed', _scale(100))
+}
+
+S_HIRES_ENCODERS = Z_HIRES_ENCODERS = {
+    'temperature': _scale(10)
+}
+
+# Record encoders of each kind of file, for the records following the data records (if any)
+HIRES_ENCODER_LAYOUTS = {
+    'edt': HIRES_ENCODERS,
+    's': S_HIRES_ENCODERS,
+    'z': Z_HIRES_ENCODERS
+}
+
+
+def _pack_section(layout, values, buf, offset):
+    encoded = []
+    for name in layout.names:
+        value = values[name]
+        if _is_missing(value):
+            value = MISSING_VALUE
+        encoder = SECTION_ENCODERS.get(name)
+        encoded.append(value if encoder is None else encoder(value))
+    layout.struct.pack_into(buf, offset, *encoded)
+
+
+def encode_column(column, encoder, dtype):
+    """
+    Return the raw values of a decoded column, as ``dtype``: scaled back with ``encoder`` (if any), rounded for
+    integer fields, and with ``MISSING_VALUE`` for the sentinel, NaN or masked values.
+
+    Raises ``ValueError`` if a value does not fit in ``dtype``.
+    """
+    mask = np.ma.getmaskarray(column) if isinstance(column, np.ma.MaskedArray) else None
+    values = np.ma.getdata(column)
+    if dtype.kind == 'u' or values.dtype.kind == 'u':
+        # the significance keys are bit masks, and the S/Z buffer raw bytes, without missing values
+        return values.astype(dtype)
+    missing = values == MISSING_VALUE
+    if values.dtype.kind == 'f':
+        missing |= np.isnan(values)
+    if mask is not None:
+        missing |= mask
+    raw = values.astype(np.float64)
+    if encoder is not None:
+        raw = encoder(raw)
+    if dtype.kind == 'i':
+        raw = np.round(raw)
+        info = np.iinfo(dtype)
+        out_of_range = ~missing & ((raw < info.min) | (raw > info.max))
+        if out_of_range.any():
+            raise ValueError("value %r does not fit in %s" % (values[out_of_range][0], dtype))
+    raw[missing] = MISSING_VALUE
+    return raw.astype(dtype)
+
+
+def encode_records(columns, dtype, encoders, out=None):
+    """
+    Encode ``Columns`` into an array of raw records with ``dtype``, written into ``out`` when given (a structured
+    array with ``dtype`` and as many records as ``columns``). The ``EXACT_COLUMNS`` are used when available, so
+    that the records parsed by the numpy engine are written back unchanged, otherwise the wind speed is written in
+    whole m/s. Extra columns, like the derived columns, are ignored.
+    """
+    if out is None:
+        out = np.zeros(len(columns), dtype=dtype)
+    for name in dtype.names:
+        column, encoder = EXACT_COLUMNS.get(name, (name, encoders.get(name)))
+        if column not in columns:
+            column, encoder = name, encoders.get(name)
+        if column not in columns:
+            raise ValueError("Missing column '%s'" % name)
+        out[name] = encode_column(columns[column], encoder, dtype.fields[name][0].base)
+    return out
+
+
+def _written_counts(kind, data_count, hires_count, record_length):
+    # the header record counts of the written records
+    counts = dict(data_records=hires_count, data_length=record_length)
+    if kind == 'edt':
+        counts['standard_levels'] = data_count
+    return counts
+
+
+def write_bytes(sounding, kind='edt', recount=False):
+    """
+    Encode a ``Sounding`` as a PC-CORA (EDT), S or Z (``kind``) file, returning its bytes, as a ``bytearray`` to
+    avoid one more copy. ``data`` is ignored for S and Z files.
+
+    The header is written as-is, so that parsed files are written back unchanged, even when their header record
+    counts (``data_records``, ``standard_levels`` for PC-CORA (EDT) files, and ``data_length``) do not match their
+    records, in which case a ``HeaderMismatchWarning`` is issued. With ``recount=True`` the counts are set from the
+    written records instead, e.g. for new or edited soundings.
+    """
+    _check_kind(kind)
+    if len(sounding.syspar) != syspar_layout.size:
+        raise ValueError("Expected %d bytes of SYSPAR, found %d" % (syspar_layout.size, len(sounding.syspar)))
+    hires_dtype = HIRES_LAYOUTS[kind][0]
+    data_count = len(sounding.data) if kind == 'edt' else 0
+    hires_count = len(sounding.hires)
+    buf = bytearray(RECORDS_OFFSET + data_count * data_dtype.itemsize + hires_count * hires_dtype.itemsize)
+
+    counts = _written_counts(kind, data_count, hires_count, hires_dtype.itemsize)
+    if recount:
+        header = dict(sounding.header, **counts)
+    else:
+        header = sounding.header
+        differences = ["%s %s instead of %d" % (name, header[name], count) for name, count in sorted(counts.items())
+                       if header[name] != count]
+        if differences:
+            warnings.warn("The header does not match the written records (%s), use recount=True to update it" %
+                          ', '.join(differences), HeaderMismatchWarning, stacklevel=2)
+    _pack_section(header_layout, header, buf, 0)
+    _pack_section(identification_layout, sounding.identification, buf, IDENTIFICATION_OFFSET)
+    buf[SYSPAR_OFFSET:RECORDS_OFFSET] = sounding.syspar
+
+    # encoded straight into the output buffer
+    if kind == 'edt':
+        encode_records(sounding.data, data_dtype, DATA_ENCODERS,
+                       np.frombuffer(buf, dtype=data_dtype, count=data_count, offset=RECORDS_OFFSET))
+    encode_records(sounding.hires, hires_dtype, HIRES_ENCODER_LAYOUTS[kind],
+                   np.frombuffer(buf, dtype=hires_dtype, count=hires_count,
+                                 offset=RECORDS_OFFSET + data_count * data_dtype.itemsize))
+    return buf
+
+
+def write_file(sounding, file_arg, kind='edt', recount=False):
+    """Write a ``Sounding`` to a PC-CORA (EDT), S or Z (``kind``) file, see ``write_bytes()``"""
+    buf = write_bytes(sounding, kind, recount)
+    with open(file_arg, 'wb') as fid:
+        fid.write(buf)
+
+
+def write_edt(sounding, file_arg, recount=False):
+    """Write a ``Sounding`` to a PC-CORA (EDT) file"""
+    write_file(sounding, file_arg, 'edt', recount)
+
+
+def write_s(sounding, file_arg, recount=False):
+    """Write a ``Sounding`` to an S file"""
+    write_file(sounding, file_arg, 's', recount)
+
+
+def write_z(sounding, file_arg, recount=False):
+    """Write a ``Sounding`` to a Z file"""
+    write_file(sounding, file_arg, 'z', recount)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+"""
+Compare the time taken by each PCCORAParser engine to parse the same file.
+
+python benchmark_engines.py ../pccora/tests/93011809.21S
+"""
+
+import argparse
+import timeit
+
+from pccora import PCCORAParser
+from pccora.pccora import ENGINES
+
+parser = argparse.ArgumentParser(description='Benchmark the PCCORAParser engines.')
+parser.add_argument('file', help='Input file')
+parser.add_argument('--method', default='parse_file', choices=['parse_file', 'parse_s_file', 'parse_z_file'],
+                    help='Parser method to benchmark')
+parser.add_argument('--repeat', type=int, default=5, help='Number of times to parse the file with each engine')
+
+
+def main():
+    args = parser.parse_args()
+
+    timings = dict()
+    for engine in ENGINES:
+        pccora_parser = PCCORAParser(engine=engine)
+        try:
+            timings[engine] = min(timeit.repeat(lambda: getattr(pccora_parser, args.method)(args.file),
+                                                repeat=args.repeat, number=1))
+        except ImportError as e:
+            print("%-10s skipped (%s)" % (engine, e))
+
+    for engine, seconds in timings.items():
+        print("%-10s %8.4f s  %6.1fx" % (engine, seconds, timings['construct'] / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,27 @@
 #!/usr/bin/env python3
 
 from pccora import *
+from pccora.numpy_engine import EXTRA_COLUMNS
+from pccora.sounding import DERIVED_COLUMNS
 
 import csv
 
 
+def record_keys(columns):
+    """The record fields of a Columns object, and spress, like the keys of the construct records"""
+    return [key for key in columns if key == 'spress' or key not in DERIVED_COLUMNS and key not in EXTRA_COLUMNS]
+
+
+def iter_rows(columns):
+    """
+    Yield the (key, value) pairs of each record of a Columns object, converting each array only once. The derived
+    and extra columns, other than spress, are left out, and not computed.
+    """
+    keys = record_keys(columns)
+    for values in zip(*[columns[key].tolist() for key in keys]):
+        yield zip(keys, values)
+
+
 def convert2csv(data, options, file):
     with(open(file, 'w')) as csvfile:
         include_header = options['include_header']
@@ -24,7 +41,7 @@ def convert2csv(data, options, file):
         csvheaders = list()
 
         if include_data:
-            for container in data_data:
+            for values in iter_rows(data_data):
                 row = list()
 
                 if include_header:
@@ -39,10 +56,10 @@ def convert2csv(data, options, file):
                             csvheaders.append(key)
                         row.append(ident[key])
 
-                for key in container:
+                for key, value in values:
                     if header_not_set:
                         csvheaders.append(key)
-                    row.append(container[key])
+                    row.append(value)
 
                 if header_not_set:
                     csvwriter.writerow(csvheaders)
@@ -50,7 +67,7 @@ def convert2csv(data, options, file):
                 csvwriter.writerow(row)
 
         if include_hires:
-            for container in hires_data:
+            for values in iter_rows(hires_data):
                 row = list()
 
                 if include_header:
@@ -65,10 +82,10 @@ def convert2csv(data, options, file):
                             csvheaders.append(key)
                         row.append(ident[key])
 
-                for key in container:
+                for key, value in values:
                     if header_not_set:
                         csvheaders.append(key)
-                    row.append(container[key])
+                    row.append(value)
 
                 if header_not_set:
                     csvwriter.writerow(csvheaders)
@@ -85,15 +102,15 @@ def main():
     include_data = False
     include_hires = True
 
-    pccora_parser = PCCORAParser()
+    pccora_parser = PCCORAParser(engine='numpy')
     pccora_parser.parse_file(file)
+    sounding = pccora_parser.get_sounding()
 
     # Data
-    head = pccora_parser.get_header()
-    ident = pccora_parser.get_identification()
-    # syspar = pccora_parser.get_syspar()
-    data = pccora_parser.get_data()
-    hires_data = pccora_parser.get_hires_data()
+    head = sounding.header
+    ident = sounding.identification
+    data = sounding.data
+    hires_data = sounding.hires
 
     # Call function to print CSV
     convert2csv(
@@ -7,16 +7,24 @@ from netCDF4 import Dataset
 from pccora import *
 
 
+def significance_key_digits(masks):
+    """
+    The significance keys as written by the earlier versions of this script: the binary digits of the two bytes of
+    each key, first byte first, rebuilt from the uint16 bit masks of the columnar results.
+    """
+    return [bin(mask & 0xff)[2:] + bin(mask >> 8)[2:] for mask in masks.tolist()]
+
+
 def parseandconvert(in_file, output):
-    pccora_parser = PCCORAParser()
+    pccora_parser = PCCORAParser(engine='numpy')
     pccora_parser.parse_file(in_file)
+    sounding = pccora_parser.get_sounding()
 
     # Data
-    head = pccora_parser.get_header()
-    ident = pccora_parser.get_identification()
-    # syspar = pccora_parser.get_syspar()
-    data = pccora_parser.get_data()
-    hires_data = pccora_parser.get_hires_data()
+    head = sounding.header
+    ident = sounding.identification
+    data = sounding.data
+    hires_data = sounding.hires
 
     # Call function to print CSV
     convert2netcdf4(
@@ -25,15 +33,17 @@ def parseandconvert(in_file, output):
 
 
 def parseandconvert_add_day(in_file, output):
-    pccora_parser = PCCORAParser()
+    pccora_parser = PCCORAParser(engine='numpy')
     pccora_parser.parse_file(in_file)
+    convert_add_day(pccora_parser.get_sounding(), output)
+
 
+def convert_add_day(sounding, output):
     # Data
-    head = pccora_parser.get_header()
-    ident = pccora_parser.get_identification()
-    # syspar = pccora_parser.get_syspar()
-    data = pccora_parser.get_data()
-    hires_data = pccora_parser.get_hires_data()
+    head = sounding.header
+    ident = sounding.identification
+    data = sounding.data
+    hires_data = sounding.hires
 
     output = output.replace('DD', str(ident['day']))
 
@@ -48,7 +58,7 @@ def convert2netcdf4(data, file):
     creating a file following the GRUAN data format standard.
 
     Keyword arguments:
-    data -- the data dictionary from a parsed radiosonde data file
+    data -- the data dictionary from a parsed radiosonde data file, with hires_data as Columns
     file -- the dataset output file
     """
     # head = data['head']
@@ -146,51 +156,26 @@ def convert2netcdf4(data, file):
     dataset.comment = 'For more information about the variables see: ' \
                       'https://badc.nerc.ac.uk/data/ukmo-rad-hires/pc-coradata.html'
 
-    elapsed_time = []
-    logarithmic_pressure = []
-    temperature = []
-    relative_humidity = []
-    north_wind = []
-    east_wind = []
-    altitude = []
-    pressure = []
-    dew_point = []
-    mixing_ratio = []
-    wind_direction = []
-    wind_speed = []
-    azimuth_angle = []
-    horizontal_distance = []
-    longitude = []
-    latitude = []
-    significance_key = []
-    recalculated_significance_key = []
-    radar_height = []
-
-    # Variables
-    for container in hires_data:
-        elapsed_time.append(container['time'])
-        logarithmic_pressure.append(container['logarithmic_pressure'])
-        temperature.append(container['temperature'])
-        relative_humidity.append(container['humidity'])
-        north_wind.append(container['north_wind'])
-        east_wind.append(container['east_wind'])
-        altitude.append(container['altitude'])
-        pressure.append(container['pressure'])
-        dew_point.append(container['dew_point_temperature'])
-        mixing_ratio.append(container['mixing_ratio'])
-        wind_direction.append(container['wind_direction'])
-        wind_speed.append(container['wind_speed'])
-        azimuth_angle.append(container['azimuth'])
-        horizontal_distance.append(container['horizontal_distance'])
-        longitude.append(container['longitude'])
-        latitude.append(container['latitude'])
-        sigkey = ''.join(container['significance_key'])
-        sigkey = sigkey.replace('0b', '')
-        significance_key.append(sigkey)
-        rsigkey = ''.join(container['recalculated_significance_key'])
-        rsigkey = rsigkey.replace('0b', '')
-        recalculated_significance_key.append(rsigkey)
-        radar_height.append(container['radar_height'])
+    # Variables, one array per field
+    elapsed_time = hires_data['time']
+    logarithmic_pressure = hires_data['logarithmic_pressure']
+    temperature = hires_data['temperature']
+    relative_humidity = hires_data['humidity']
+    north_wind = hires_data['north_wind']
+    east_wind = hires_data['east_wind']
+    altitude = hires_data['altitude']
+    pressure = hires_data['pressure']
+    dew_point = hires_data['dew_point_temperature']
+    mixing_ratio = hires_data['mixing_ratio']
+    wind_direction = hires_data['wind_direction']
+    wind_speed = hires_data['wind_speed']
+    azimuth_angle = hires_data['azimuth']
+    horizontal_distance = hires_data['horizontal_distance']
+    longitude = hires_data['longitude']
+    latitude = hires_data['latitude']
+    significance_key = significance_key_digits(hires_data['significance_key'])
+    recalculated_significance_key = significance_key_digits(hires_data['recalculated_significance_key'])
+    radar_height = hires_data['radar_height']
 
     # elapsed_time
     elapsed_time_variable = dataset.createVariable('time', 'f4', ("time",), zlib=True, fill_value=-32768)
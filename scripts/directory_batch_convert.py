@@ -5,13 +5,20 @@ import re
 import sys
 from pathlib import Path
 
-from convert2netcdf4 import parseandconvert_add_day
+from convert2netcdf4 import convert_add_day
+from pccora import iter_parse_many
 
 parser = argparse.ArgumentParser(
     description='Recursively batch convert Vaisala old-binary format to NetCDF files. Keeps directory structure.')
 parser.add_argument('--from', dest='fromdir', help='Input directory', required=True)
 parser.add_argument('--to', dest='todir', help='Output directory. Created if not exists. Files will be overwritten.',
                     required=True)
+parser.add_argument('--workers', type=int, default=None,
+                    help='Number of processes parsing the files. Defaults to the number of CPUs.')
+parser.add_argument('--shared-memory', dest='shared_memory', action='store_true',
+                    help='Send the parsed files to the main process through shared memory (Python 3.8+).')
+parser.add_argument('--recover', action='store_true',
+                    help='Convert the valid records of truncated or corrupt files, instead of failing.')
 
 EXTENSION_REGEX = r'.*\.edt$|.*\.[0-9]{2}e$'
 
@@ -45,6 +52,8 @@ def process():
     # total_error = 0
     failed_to_process = []
     skipped_files = []
+    # output file of each input file to parse
+    jobs = {}
 
     for dirpath, dirnames, files in os.walk(from_dir.as_posix()):
         for name in files:
@@ -88,16 +97,26 @@ def process():
                     logger.debug("Skipping zero byte file [%s]" % input_file)
                     continue
 
-                # print(output_file)
-                try:
-                    parseandconvert_add_day(input_file, output_file)
-                    total_success = total_success + 1
-                    logger.info("Successfully parsed [%s]" % output_file)
-                except KeyboardInterrupt:
-                    raise
-                except Exception as e:
-                    failed_to_process.append(input_file)
-                    logger.error("Error parsing [%s]: %s" % (input_file, e))
+                jobs[input_file] = output_file
+
+    # files are parsed in parallel, and converted as soon as parsed
+    transport = 'shared_memory' if args.shared_memory else 'pickle'
+    for result in iter_parse_many(jobs.keys(), workers=args.workers, transport=transport, recover=args.recover):
+        input_file = result.path
+        output_file = jobs[input_file]
+        for problem in result.problems:
+            logger.warning("Problem in [%s] at byte %d: %s" % (input_file, problem.offset, problem.reason))
+        try:
+            if not result.ok:
+                raise result.error
+            convert_add_day(result.sounding, output_file)
+            total_success = total_success + 1
+            logger.info("Successfully parsed [%s]" % output_file)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            failed_to_process.append(input_file)
+            logger.error("Error parsing [%s]: %s" % (input_file, e))
 
     logger.info("### Stats ###")
     logger.info("- TOTAL   %d" % total_files)
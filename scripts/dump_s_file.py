@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-import math
-
 from pccora import *
 
 
@@ -10,39 +8,31 @@ def dump_values(obj):
         print("%s -> %s" % (key, obj[key]))
 
 
-def dump_array_values(obj, elapsed_time):
-    i = 0
-    for container in obj:
-        if 2999 <= i <= 3019:
-            ti = container['time']
-            p = math.exp(float(container['logarithmic_pressure']) / float(4096))
-            t = float(container['temperature'])
-            h = float(container['humidity'])
-            nu = container['n_data']
-            c = container['cycles']
-            print("%s\t%s\t%.2f %.1f  %.1f\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s" % (
-                i + 1,
-                (ti - elapsed_time),
-                p,
-                t,
-                h,
-                nu,
-                container['c1'],
-                container['c2'],
-                container['c3'],
-                container['c4'],
-                container['c5'],
-                container['c6'],
-                container['c7'],
-                container['c8'],
-                c))
-        i = i + 1
+def dump_array_values(columns, elapsed_time, start=2999, stop=3020):
+    # only decode the window of records printed
+    times = columns['time'][start:stop]
+    pressures = columns['spress'][start:stop]
+    temperatures = columns['temperature'][start:stop]
+    humidities = columns['humidity'][start:stop]
+    n_data = columns['n_data'][start:stop]
+    counts = columns['counts'][start:stop]
+    cycles = columns['cycles'][start:stop]
+    for i in range(0, len(times)):
+        print("%s\t%s\t%.2f %.1f  %.1f\t%s\t%s\t%s" % (
+            start + i + 1,
+            (times[i] - elapsed_time),
+            pressures[i],
+            temperatures[i],
+            humidities[i],
+            n_data[i],
+            '\t'.join(str(count) for count in counts[i]),
+            cycles[i]))
 
 
 def main():
     file = '/home/kinow/Downloads/97031210.59s'
 
-    pccora_parser = PCCORAParser()
+    pccora_parser = PCCORAParser(engine='numpy')
     pccora_parser.parse_s_file(file)
     # pccora_parser.parse_z_file(file)
 
@@ -0,0 +1,40 @@
+import argparse
+import logging
+import sys
+import time
+
+from pccora import scan_directory
+from pccora.scanner import FILE_NAME_REGEX
+
+parser = argparse.ArgumentParser(
+    description='Scan a directory of PC-CORA files, writing the header and identification of each file as CSV.')
+parser.add_argument('--from', dest='fromdir', help='Input directory', required=True)
+parser.add_argument('--to', dest='tofile', help='Output CSV file. Overwritten if exists.', required=True)
+parser.add_argument('--workers', type=int, default=None,
+                    help='Number of threads reading the files. Defaults to four per CPU, at most 32.')
+parser.add_argument('--pattern', default=FILE_NAME_REGEX,
+                    help='Regular expression matching the names of the files to scan (default: %(default)s)')
+
+FORMAT = '%(asctime)s %(message)s'
+logging.basicConfig(format=FORMAT, level=logging.INFO)
+
+
+# python scan_archive.py --from ~/Desktop/INVRCRGL/ --to ~/Desktop/INVRCRGL.csv
+
+def main():
+    args = parser.parse_args()
+    start = time.time()
+    table = scan_directory(args.fromdir, workers=args.workers, pattern=args.pattern)
+    table.to_csv(args.tofile)
+    errors = [row for row in table.rows() if row['error'] is not None]
+    for row in errors:
+        logging.error("Error reading [%s]: %s" % (row['path'], row['error']))
+    logging.info("Scanned %d files (%d errors) in %.1f seconds" % (len(table), len(errors), time.time() - start))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.info("User canceled execution! Bye")
+        sys.exit(1)
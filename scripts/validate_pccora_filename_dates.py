@@ -34,10 +34,8 @@ def main():
 
         # now compare the date data from the identification section
 
-        pccora_parser = PCCORAParser()
-        pccora_parser.parse_file(filename)
-        # head = pccora_parser.get_header()
-        ident = pccora_parser.get_identification()
+        # only the identification section is needed, no need to parse the records
+        ident = read_metadata(filename).pccora_identification
 
         date_within_file = ''.join([
             str(ident['message_year']), str(ident['message_month']), str(ident['message_day']),
@@ -17,6 +17,9 @@ install_requires = [
 ]
 
 extras_require = {
+    'numpy': [
+        'numpy'
+    ],
     'scripts_linux': [
         'jinja2',
         'netcdf4',